@@ -1,6 +1,10 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
+import asyncio
+import hashlib
+import hmac
+import os
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -9,7 +13,6 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.util import md5_hex
 
 from config import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, SECRET_KEY
 from db import get_db
@@ -18,8 +21,33 @@ from models_db import User
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 
+SCRYPT_PREFIX = "scrypt$"
+SCRYPT_PARAMS = {"n": 2**14, "r": 8, "p": 1, "dklen": 32}
+
+
+def _scrypt(password: str, salt: bytes) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, **SCRYPT_PARAMS)
+
+
+def hash_password(password: str) -> str:
+    salt = os.urandom(16)
+    return f"{SCRYPT_PREFIX}{salt.hex()}${_scrypt(password, salt).hex()}"
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    # Hashes stored before scrypt are bare MD5 hex digests
+    return not hashed_password.startswith(SCRYPT_PREFIX)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return md5_hex(plain_password) == hashed_password
+    if needs_rehash(hashed_password):
+        legacy = hashlib.md5(plain_password.encode(), usedforsecurity=False)
+        return hmac.compare_digest(legacy.hexdigest(), hashed_password)
+
+    salt, key = hashed_password[len(SCRYPT_PREFIX) :].split("$")
+    return hmac.compare_digest(
+        _scrypt(plain_password, bytes.fromhex(salt)), bytes.fromhex(key)
+    )
 
 
 async def authenticate_user(
@@ -29,8 +57,13 @@ async def authenticate_user(
     user = result.scalar_one_or_none()
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    # scrypt is deliberately slow, keep it off the event loop
+    if not await asyncio.to_thread(verify_password, password, user.hashed_password):
         return None
+    if needs_rehash(user.hashed_password):
+        # Upgrade a legacy MD5 hash now that the plain password is known
+        user.hashed_password = await asyncio.to_thread(hash_password, password)
+        await db.commit()
     return user
 
 
@@ -61,6 +94,9 @@ async def get_current_user(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication",
             )
+        # End the read so the connection goes back to the pool while the
+        # request waits on the workers
+        await db.commit()
         return user
     except JWTError:
         raise HTTPException(
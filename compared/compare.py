@@ -1,340 +1,655 @@
+import gzip
 import json
-import math
 import os
+import re
+import string
 from datetime import datetime
+from functools import cached_property, lru_cache
 
+import numpy as np
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib json parser
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # optional, batches are loaded in full without it
+    ijson = None
+
+
+# Max lat/lng difference, in degrees, for two locations to be the same place
+MATCH_TOLERANCE = 1e-4
+
+COLORS = ("dark_red", "red", "yellow", "green", "gray")
+RADII = ("50m", "100m", "150m")
+
+# Flattened color columns -> color_distribution keys, and the per-radius area
+# (score column, pixels column, radius) triples, built once for the module
+COLOR_KEYS = {f"color_{color}": color for color in COLORS}
+AREA_KEYS = [
+    (f"area_{radius}_score", f"area_{radius}_pixels", radius) for radius in RADII
+]
+
+# 32-bit dtypes for location fields, lat/lng stay float64 for the match key
+LOCATION_DTYPES = {
+    "score": "float32",
+    "storefront_score": "float32",
+    "area_score": "float32",
+    "total_pixels_analyzed": "int32",
+    "storefront_distance": "float32",
+    **dict.fromkeys(COLOR_KEYS, "int32"),
+    **{score: "float32" for score, _, _ in AREA_KEYS},
+    **{pixels: "int32" for _, pixels, _ in AREA_KEYS},
+}
+
+# Day and time in a screenshot filename, e.g. traffic_24.7934_46.5934_Monday_10PM_pinned.png
+DAY_TIME_RE = re.compile(r"traffic_[^_]*_[^_]*_([^_]+)_([^_]+)_pinned")
+
+# Screenshot time categories in day order
+TIME_CATEGORY_LABELS = ["Early Morning", "Morning", "Afternoon", "Evening", "Night"]
+
+# (hour, AM/PM) -> time category for screenshot times, 12 AM and later AM
+# hours are left out so they categorize as unknown
+TIME_CATEGORY_TABLE = {}
+for _hour in range(24):
+    if _hour < 12:
+        TIME_CATEGORY_TABLE[(_hour, "AM")] = "Early Morning" if _hour < 6 else "Morning"
+    TIME_CATEGORY_TABLE[(_hour, "PM")] = (
+        "Afternoon" if _hour == 12 or _hour < 6 else "Evening" if _hour < 9 else "Night"
+    )
+del _hour
+TIME_CATEGORY_LOOKUP = pd.Series(TIME_CATEGORY_TABLE)
+
+TRAFFIC_TYPES = ["typical", "live", "unknown"]
+
+# Table badge class and letter per TRAFFIC_TYPES category code
+TRAFFIC_BADGE_CLASSES = np.array(
+    ["traffic-typical" if t == "typical" else "traffic-live" for t in TRAFFIC_TYPES]
+)
+TRAFFIC_BADGE_LETTERS = np.array([t[0].upper() for t in TRAFFIC_TYPES])
+
+# Low-cardinality location fields stored as categoricals. traffic_type uses
+# fixed categories so Selenium and Playwright columns compare code-for-code
+CATEGORICAL_DTYPES = {
+    "source": "category",
+    "traffic_type": pd.CategoricalDtype(TRAFFIC_TYPES),
+    "method": "category",
+    "storefront_color": "category",
+    "day_of_week": "category",
+    "time_of_day": "category",
+    "time_category": pd.CategoricalDtype([*TIME_CATEGORY_LABELS, "Unknown"]),
+}
+
+# json_normalize column names -> flattened location fields
+LOCATION_RENAMES = {
+    "coordinates_lat": "lat",
+    "coordinates_lng": "lng",
+    "storefront_details_found": "storefront_found",
+    "storefront_details_distance": "storefront_distance",
+    "storefront_details_color": "storefront_color",
+    **{f"color_distribution_{color}": out for out, color in COLOR_KEYS.items()},
+    **{f"area_details_{radius}_score": score for score, _, radius in AREA_KEYS},
+    **{f"area_details_{radius}_pixels": pixels for _, pixels, radius in AREA_KEYS},
+}
+
+# Flattened location fields and the defaults used when a field is missing
+LOCATION_DEFAULTS = {
+    "lat": 0,
+    "lng": 0,
+    "score": 0,
+    "storefront_score": 0,
+    "area_score": 0,
+    "total_pixels_analyzed": 0,
+    "traffic_type": "unknown",
+    "method": "unknown",
+    "storefront_found": False,
+    "storefront_distance": 0,
+    "storefront_color": "gray",
+    "analysis_timestamp": 0,
+    "screenshot_path": "",
+    **dict.fromkeys(COLOR_KEYS, 0),
+    **{column: 0 for score, pixels, _ in AREA_KEYS for column in (score, pixels)},
+}
+
+# Columns carried from the matched location pairs into the comparison frame
+COMPARISON_COLUMNS = [
+    "coordinates",
+    "lat",
+    "lng",
+    "traffic_type_selenium",
+    "traffic_type_playwright",
+    "day_of_week",
+    "time_of_day",
+    "time_category",
+    "score_selenium",
+    "score_playwright",
+    "score_difference",
+    "score_improvement_pct",
+    "storefront_score_selenium",
+    "storefront_score_playwright",
+    "storefront_found_selenium",
+    "storefront_found_playwright",
+    "area_score_selenium",
+    "area_score_playwright",
+    "pixels_selenium",
+    "pixels_playwright",
+    "storefront_distance_selenium",
+    "storefront_distance_playwright",
+    "storefront_color_selenium",
+    "storefront_color_playwright",
+]
+
+# (metric name, location column) pairs compared as absolute/relative differences
+VARIATION_SOURCES = [
+    ("score", "score"),
+    *[(f"area_{radius}", score) for score, _, radius in AREA_KEYS],
+    *[(column, column) for column in COLOR_KEYS],
+]
+
+# Per-side merged column names for the variation sources
+VARIATION_COLUMNS = {
+    side: [f"{column}_{side}" for _, column in VARIATION_SOURCES]
+    for side in ("selenium", "playwright")
+}
+
+# Columns fed to summarize_scores and the summary keys of its results
+SCORE_SUMMARY_COLUMNS = [
+    "score_selenium",
+    "score_playwright",
+    "score_difference",
+    "score_improvement_pct",
+    "score_relative_difference",
+]
+SCORE_SUMMARY_KEYS = [
+    "avg_score_selenium",
+    "avg_score_playwright",
+    "avg_score_improvement",
+    "avg_score_improvement_pct",
+    "max_improvement",
+    "max_improvement_pct",
+    "locations_with_improvement",
+    "locations_with_degradation",
+    "locations_unchanged",
+    "low_variation_locations",
+    "medium_variation_locations",
+    "high_variation_locations",
+]
+
+# Variation frame columns, absolute/relative difference pairs per source
+VARIATION_RESULT_COLUMNS = [
+    f"{name}_{kind}_difference"
+    for name, _ in VARIATION_SOURCES
+    for kind in ("absolute", "relative")
+]
+
+# Per-group location count and mean scores for the time/day analysis
+PERFORMANCE_AGGREGATIONS = {
+    "count": ("score_difference", "size"),
+    "score_difference": ("score_difference", "mean"),
+    "score_relative_difference": ("score_relative_difference", "mean"),
+    "score_selenium": ("score_selenium", "mean"),
+    "score_playwright": ("score_playwright", "mean"),
+}
+
+# Per (Selenium, Playwright) traffic type pair location count and mean scores
+TRAFFIC_TYPE_AGGREGATIONS = {
+    "locations_count": ("score_selenium", "size"),
+    "avg_score_selenium": ("score_selenium", "mean"),
+    "avg_score_playwright": ("score_playwright", "mean"),
+    "score_difference": ("score_difference", "mean"),
+    "score_difference_pct": ("score_improvement_pct", "mean"),
+}
+
+# Grouping column -> (distribution key, performance key) in the time analysis
+TIME_ANALYSIS_KEYS = {
+    "time_category": ("time_category_distribution", "performance_by_time_category"),
+    "day_of_week": ("day_distribution", "performance_by_day"),
+}
+
+# Trend arrow per sign of a difference plus its sign beyond the threshold
+TREND_ARROWS = {
+    2: "🟢 ↑",  # Significant improvement
+    1: "↗️",  # Slight improvement
+    0: "➡️",  # No change
+    -1: "↘️",  # Slight degradation
+    -2: "🔴 ↓",  # Significant degradation
+}
+TREND_ARROW_CHOICES = np.array([TREND_ARROWS[key] for key in range(-2, 3)])
+
+# Report footer after the table rows, filled with string.Template so the
+# embedded JSON and JS need no brace escaping
+REPORT_FOOTER = string.Template("""
+                    </tbody>
+                </table>
+                $pagination_controls
+                <div style="margin-top: 30px; padding: 20px; background: #f8f9fa; border-radius: 8px;">
+                    <h3>🎯 Key Findings & Observations</h3>
+                    <ul>
+                        <li>Playwright showed higher scores in <strong>$improved_locations</strong> out of <strong>$total_locations</strong> locations</li>
+                        <li>Processing time: Playwright is <strong>$time_comparison</strong> by <strong>${time_diff_abs}s ($time_diff_pct_abs%)</strong></li>
+                        <li>Maximum score difference: <strong>$max_imp</strong> points</li>
+                        <li>Storefront detection differed in <strong>$store_imp</strong> locations</li>
+                        <li>Traffic type consistency: <strong>$traffic_consistency%</strong></li>
+                        <li>Average score variation: <strong>$mean_variation_pct%</strong></li>
+                        <li>Overall consistency: <strong>$overall_consistency%</strong></li>
+                    </ul>
+                </div>
+            </div>
+            <script id="locationRows" type="application/json">$row_data</script>
+            $pagination_script
+        </body>
+        </html>
+        """)
+
+# Per-row values shipped as JSON for the table pages rendered in the browser
+ROW_DATA_COLUMNS = [
+    "coordinates",
+    "day_of_week",
+    "time_of_day",
+    "time_category",
+    "traffic_type_selenium",
+    "traffic_type_playwright",
+    "score_selenium",
+    "score_playwright",
+    "score_difference",
+    "score_improvement_pct",
+    "storefront_found_selenium",
+    "storefront_found_playwright",
+    "score_relative_difference",
+]
+
+# Stylesheet inlined into the HTML report
+REPORT_CSS = """
+body { font-family: 'Arial', 'Segoe UI', Tahoma, sans-serif; margin: 20px; background-color: #f5f5f5; }
+.container { max-width: 1400px; margin: 0 auto; background: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+.header { text-align: center; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px; margin-bottom: 20px; }
+.summary { background: #f8f9fa; padding: 20px; border-radius: 8px; margin-bottom: 20px; }
+.metric-card { background: white; padding: 15px; margin: 10px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); display: inline-block; width: calc(25% - 40px); min-width: 200px; text-align: center; }
+.metric-value { font-size: 24px; font-weight: bold; color: #333; }
+.metric-label { font-size: 14px; color: #666; }
+.improvement-positive { color: #28a745; }
+.improvement-negative { color: #dc3545; }
+.variation-high { color: #dc3545; background-color: #ffe6e6; }
+.variation-medium { color: #ffc107; background-color: #fff9e6; }
+.variation-low { color: #28a745; background-color: #e6ffe6; }
+table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+th, td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
+th { background-color: #f8f9fa; font-weight: bold; text-align: center; }
+tr:hover { background-color: #f5f5f5; }
+.screenshot-cell { max-width: 200px; }
+.screenshot-img { max-width: 150px; max-height: 100px; border: 1px solid #ddd; border-radius: 4px; }
+.section-title { background: #e9ecef; padding: 15px; border-radius: 8px; margin: 30px 0 15px 0; border-left: 5px solid #667eea; }
+.variation-metrics { display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 15px; margin: 20px 0; }
+.variation-metric-card { background: white; padding: 15px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); border-left: 4px solid #6c757d; }
+.pagination-controls { display: flex; justify-content: space-between; align-items: center; margin: 20px 0; padding: 10px; background: #f8f9fa; border-radius: 8px; }
+.pagination-buttons { display: flex; gap: 5px; }
+.page-btn, .page-nav { padding: 8px 12px; border: 1px solid #ddd; background: white; cursor: pointer; border-radius: 4px; }
+.page-btn.active { background: #667eea; color: white; border-color: #667eea; }
+.page-btn:hover, .page-nav:hover { background: #e9ecef; }
+.page-nav:disabled { background: #f8f9fa; color: #6c757d; cursor: not-allowed; }
+.page-info { font-weight: bold; color: #495057; }
+.traffic-badge { padding: 4px 8px; border-radius: 12px; font-size: 12px; font-weight: bold; }
+.traffic-typical { background: #d4edda; color: #155724; }
+.traffic-live { background: #f8d7da; color: #721c24; }
+.trend-arrow { font-size: 16px; margin-right: 5px; }
+.page-ellipsis { padding: 8px 4px; color: #6c757d; }
+.time-badge { padding: 4px 8px; border-radius: 12px; font-size: 11px; font-weight: bold; background: #e9ecef; color: #495057; }
+.analysis-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; margin: 20px 0; }
+.analysis-card { background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
+"""
+
+# Detailed comparison table row, %-formatted from one tuple of cells per row
+ROW_TEMPLATE = """
+<tr>
+<td>%s</td>
+<td>
+<div>%s</div>
+<div class="time-badge">%s (%s)</div>
+</td>
+<td>
+<span class="traffic-badge %s">%s</span> / 
+<span class="traffic-badge %s">%s</span>
+</td>
+<td>%.2f</td>
+<td>%.2f</td>
+<td class="%s">%s %.2f</td>
+<td class="%s">%s %.1f%%</td>
+<td>%s / %s</td>
+<td class="%s">%.1f%%</td>
+</tr>
+"""
+
+
+def summarize_scores_numpy(
+    selenium, playwright, difference, improvement_pct, relative_difference
+):
+    """Score means, maxima and improvement/variation counts as NumPy reductions"""
+    return (
+        np.nanmean(selenium),
+        np.nanmean(playwright),
+        np.nanmean(difference),
+        np.nanmean(improvement_pct),
+        np.nanmax(difference),
+        np.nanmax(improvement_pct),
+        np.count_nonzero(difference > 0),
+        np.count_nonzero(difference < 0),
+        np.count_nonzero(difference == 0),
+        np.count_nonzero(relative_difference < 10),
+        np.count_nonzero((relative_difference >= 10) & (relative_difference < 25)),
+        np.count_nonzero(relative_difference >= 25),
+    )
+
+
+def summarize_scores_loop(
+    selenium, playwright, difference, improvement_pct, relative_difference
+):
+    """Same results as summarize_scores_numpy from a single pass, for numba"""
+    sums = np.zeros(4)
+    counts = np.zeros(4)
+    max_difference = -np.inf
+    max_improvement_pct = -np.inf
+    improved = degraded = unchanged = low = medium = high = 0
+    for i in range(len(difference)):
+        values = (selenium[i], playwright[i], difference[i], improvement_pct[i])
+        for j in range(4):
+            if not np.isnan(values[j]):
+                sums[j] += values[j]
+                counts[j] += 1
+        if difference[i] > max_difference:
+            max_difference = difference[i]
+        if improvement_pct[i] > max_improvement_pct:
+            max_improvement_pct = improvement_pct[i]
+        if difference[i] > 0:
+            improved += 1
+        elif difference[i] < 0:
+            degraded += 1
+        elif difference[i] == 0:
+            unchanged += 1
+        if relative_difference[i] < 10:
+            low += 1
+        elif relative_difference[i] < 25:
+            medium += 1
+        elif relative_difference[i] >= 25:
+            high += 1
+    means = sums / counts
+    return (
+        means[0],
+        means[1],
+        means[2],
+        means[3],
+        max_difference,
+        max_improvement_pct,
+        improved,
+        degraded,
+        unchanged,
+        low,
+        medium,
+        high,
+    )
+
+
+# numba and scipy are optional and slow to import, so both load on first use
+@lru_cache(maxsize=None)
+def score_summarizer():
+    """summarize_scores_loop compiled with numba, or the NumPy version without it"""
+    try:
+        from numba import njit
+    except ImportError:  # optional, score summaries fall back to NumPy reductions
+        return summarize_scores_numpy
+    return njit(cache=True)(summarize_scores_loop)
+
+
+def summarize_scores(*columns):
+    """Score summary tuple, see summarize_scores_numpy"""
+    return score_summarizer()(*columns)
+
+
+@lru_cache(maxsize=None)
+def kd_tree_class():
+    """scipy's cKDTree, or None when scipy is not installed"""
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:  # optional, locations match on quantized coordinates without it
+        return None
+    return cKDTree
+
 
 class TrafficAnalysisComparator:
     def __init__(self, selenium_file, playwright_file):
+        self.selenium_file = selenium_file
+        self.playwright_file = playwright_file
         self.selenium_data = self.load_json(selenium_file)
         self.playwright_data = self.load_json(playwright_file)
         self.comparison_results = {}
 
     def load_json(self, file_path):
-        """Load JSON data from file"""
+        """Load JSON data from file, leaving batches to be streamed with ijson"""
+        if ijson is not None:
+            with open(file_path, "rb") as f:
+                total_time = ijson.items(
+                    f, "total_processing_time_seconds", use_float=True
+                )
+                return {"total_processing_time_seconds": next(total_time, 0)}
+
+        if orjson is not None:
+            with open(file_path, "rb") as f:
+                return orjson.loads(f.read())
+
         with open(file_path, "r", encoding="utf-8") as f:
             return json.load(f)
 
-    def extract_location_data(self, data, source_name):
-        """Extract and flatten location data from JSON structure"""
-        locations = []
+    def iter_batches(self, file_path, data):
+        """Yield batches from loaded data, or stream them from file"""
+        if "batches" in data or ijson is None:
+            yield from data.get("batches", [])
+            return
 
-        for batch in data.get("batches", []):
-            batch_num = batch.get("batch_number", 1)
-            batch_processing_time = batch.get("processing_time", 0)
+        with open(file_path, "rb") as f:
+            yield from ijson.items(f, "batches.item", use_float=True)
+
+    def extract_location_data(self, batches, source_name):
+        """Extract and flatten location data from batches"""
+        locations = []
+        batch_numbers, batch_processing_times, batch_sizes = [], [], []
+        for batch in batches:
+            if "result" not in batch:
+                continue
 
             # Handle both result structures (list vs dict with locations key)
-            if "result" in batch:
-                if isinstance(batch["result"], list):
-                    batch_locations = batch["result"]
-                elif (
-                    isinstance(batch["result"], dict) and "locations" in batch["result"]
-                ):
-                    batch_locations = batch["result"]["locations"]
-                else:
-                    batch_locations = []
-
-                for loc in batch_locations:
-                    if loc:  # Ensure location data exists
-                        # Extract day and time from screenshot path
-                        screenshot_path = loc.get("screenshot_path", "")
-                        day_time_info = self.extract_day_time_from_path(screenshot_path)
-
-                        location_data = {
-                            "source": source_name,
-                            "batch_number": batch_num,
-                            "batch_processing_time": batch_processing_time,
-                            "coordinates": f"{loc.get('coordinates', {}).get('lat', 'N/A')}, {loc.get('coordinates', {}).get('lng', 'N/A')}",
-                            "lat": loc.get("coordinates", {}).get("lat", 0),
-                            "lng": loc.get("coordinates", {}).get("lng", 0),
-                            "score": loc.get("score", 0),
-                            "storefront_score": loc.get("storefront_score", 0),
-                            "area_score": loc.get("area_score", 0),
-                            "total_pixels_analyzed": loc.get(
-                                "total_pixels_analyzed", 0
-                            ),
-                            "traffic_type": loc.get("traffic_type", "unknown"),
-                            "method": loc.get("method", "unknown"),
-                            "storefront_found": loc.get("storefront_details", {}).get(
-                                "found", False
-                            ),
-                            "storefront_distance": loc.get(
-                                "storefront_details", {}
-                            ).get("distance", 0),
-                            "storefront_color": loc.get("storefront_details", {}).get(
-                                "color", "gray"
-                            ),
-                            "analysis_timestamp": loc.get("analysis_timestamp", 0),
-                            # "screenshot_url": loc.get("screenshot_url", ""),
-                            "day_of_week": day_time_info["day"],
-                            "time_of_day": day_time_info["time"],
-                            "time_category": day_time_info["category"],
-                        }
-
-                        # Add color distribution
-                        color_dist = loc.get("color_distribution", {})
-                        for color in ["dark_red", "red", "yellow", "green", "gray"]:
-                            location_data[f"color_{color}"] = color_dist.get(color, 0)
-
-                        # Add area details
-                        area_details = loc.get("area_details", {})
-                        for radius in ["50m", "100m", "150m"]:
-                            area_data = area_details.get(radius, {})
-                            location_data[f"area_{radius}_score"] = area_data.get(
-                                "score", 0
-                            )
-                            location_data[f"area_{radius}_pixels"] = area_data.get(
-                                "pixels", 0
-                            )
-
-                        locations.append(location_data)
-
-        return locations
-
-    def extract_day_time_from_path(self, screenshot_path):
-        """Extract day of week and time from screenshot path"""
-        import re
-
-        # Default values
-        day_time_info = {"day": "Unknown", "time": "Unknown", "category": "Unknown"}
-
-        if not screenshot_path:
-            return day_time_info
-
-        # Extract filename
-        filename = os.path.basename(screenshot_path)
-
-        # Pattern to match day and time in filename
-        # 24.7934_46.5934
-        pattern = r"traffic_.*?_.*?_(.*?)_(.*?)_pinned"
-        match = re.search(pattern, filename)
-
-        if match:
-            day_part = match.group(1)
-            time_part = match.group(2)
-
-            # # Map day names to standardized format
-            # day_mapping = {
-            #     "monday": "Monday",
-            #     "tuesday": "Tuesday",
-            #     "wednesday": "Wednesday",
-            #     "thursday": "Thursday",
-            #     "friday": "Friday",
-            #     "saturday": "Saturday",
-            #     "sunday": "Sunday",
-            # }
-
-            # # Standardize day name
-            # day_lower = day_part.lower()
-            # day_time_info["day"] = day_mapping.get(day_lower, day_part)
-
-            day_time_info["day"] = day_part.capitalize()
-
-            # Standardize time format
-            time_part = (
-                time_part.replace("-", ":").replace("AM", " AM").replace("PM", " PM")
-            ).split("_")[-1]
-            day_time_info["time"] = time_part
-
-            # Categorize time
-            if "AM" in time_part:
-                hour = int(
-                    time_part.split(":")[0]
-                    if ":" in time_part
-                    else time_part.split()[0]
-                )
-                if hour < 6:
-                    day_time_info["category"] = "Early Morning"
-                elif hour < 12:
-                    day_time_info["category"] = "Morning"
-            else:  # PM
-                hour = int(
-                    time_part.split(":")[0]
-                    if ":" in time_part
-                    else time_part.split()[0]
-                )
-                if hour == 12 or hour < 6:
-                    day_time_info["category"] = "Afternoon"
-                elif hour < 9:
-                    day_time_info["category"] = "Evening"
-                else:
-                    day_time_info["category"] = "Night"
-
-        return day_time_info
-
-    def calculate_variation_metrics(self, selenium_loc, playwright_loc):
-        """Calculate various variation metrics between Selenium and Playwright"""
-        variation_metrics = {}
-
-        # Score variations
-        variation_metrics["score_absolute_difference"] = abs(
-            playwright_loc["score"] - selenium_loc["score"]
+            batch_locations = batch["result"]
+            if isinstance(batch_locations, dict):
+                batch_locations = batch_locations.get("locations", [])
+            elif not isinstance(batch_locations, list):
+                batch_locations = []
+
+            batch_locations = [loc for loc in batch_locations if loc]
+            locations.extend(batch_locations)
+
+            # Batch fields are kept per batch and expanded column-wise below
+            batch_numbers.append(batch.get("batch_number", 1))
+            batch_processing_times.append(batch.get("processing_time", 0))
+            batch_sizes.append(len(batch_locations))
+
+        df = pd.json_normalize(locations, sep="_").rename(columns=LOCATION_RENAMES)
+        df = df.reindex(columns=list(LOCATION_DEFAULTS))
+        df.insert(0, "batch_number", np.repeat(batch_numbers, batch_sizes))
+        df.insert(
+            1,
+            "batch_processing_time",
+            np.repeat(batch_processing_times, batch_sizes),
         )
-        variation_metrics["score_relative_difference"] = (
-            (
-                variation_metrics["score_absolute_difference"]
-                / selenium_loc["score"]
-                * 100
-            )
-            if selenium_loc["score"] > 0
-            else 0
+
+        # Coordinates label keeps "N/A" for missing values, before defaults apply
+        coordinates = df[["lat", "lng"]].astype(object)
+        coordinates = coordinates.where(coordinates.notna(), "N/A").astype(str)
+        df = df.fillna(LOCATION_DEFAULTS).astype(LOCATION_DTYPES)
+
+        # Extract day and time from screenshot path
+        day_time_info = self.extract_day_time_from_paths(
+            df["screenshot_path"].astype(object)
         )
 
-        # Storefront detection variation
-        variation_metrics["storefront_detection_variation"] = (
-            1
-            if selenium_loc["storefront_found"] != playwright_loc["storefront_found"]
-            else 0
+        df.insert(0, "source", source_name)
+        df.insert(3, "coordinates", coordinates["lat"] + ", " + coordinates["lng"])
+        df["day_of_week"] = day_time_info["day"]
+        df["time_of_day"] = day_time_info["time"]
+        df["time_category"] = day_time_info["category"]
+
+        # Unexpected traffic types would fall outside the fixed categories
+        df["traffic_type"] = df["traffic_type"].where(
+            df["traffic_type"].isin(TRAFFIC_TYPES), "unknown"
         )
 
-        # Storefront distance variation
-        variation_metrics["storefront_distance_difference"] = abs(
-            selenium_loc["storefront_distance"] - playwright_loc["storefront_distance"]
+        return df.drop(columns="screenshot_path").astype(CATEGORICAL_DTYPES)
+
+    def extract_day_time_from_paths(self, screenshot_paths):
+        """Extract day of week, time and time category from screenshot paths"""
+        # Extract day and time from the filename
+        parts = screenshot_paths.str.rsplit("/", n=1).str[-1].str.extract(DAY_TIME_RE)
+
+        # Standardize time format
+        time_part = (
+            parts[1]
+            .str.replace("-", ":", regex=False)
+            .str.replace("AM", " AM", regex=False)
+            .str.replace("PM", " PM", regex=False)
         )
 
-        # Area score variations
-        for radius in ["50m", "100m", "150m"]:
-            sel_area = selenium_loc.get(f"area_{radius}_score", 0)
-            play_area = playwright_loc.get(f"area_{radius}_score", 0)
-            variation_metrics[f"area_{radius}_absolute_difference"] = abs(
-                play_area - sel_area
-            )
-            variation_metrics[f"area_{radius}_relative_difference"] = (
-                (
-                    variation_metrics[f"area_{radius}_absolute_difference"]
-                    / sel_area
-                    * 100
-                )
-                if sel_area > 0
-                else 0
-            )
+        # Categorize time by looking up (hour, AM/PM) in the category table
+        hour = pd.to_numeric(time_part.str.extract(r"^(\d+)", expand=False))
+        meridiem = np.where(
+            time_part.str.contains("AM", regex=False, na=False), "AM", "PM"
+        )
+        category = TIME_CATEGORY_LOOKUP.reindex(
+            pd.MultiIndex.from_arrays([hour, meridiem])
+        )
 
-        # Color distribution variations
-        for color in ["dark_red", "red", "yellow", "green", "gray"]:
-            sel_color = selenium_loc.get(f"color_{color}", 0)
-            play_color = playwright_loc.get(f"color_{color}", 0)
-            variation_metrics[f"color_{color}_absolute_difference"] = abs(
-                play_color - sel_color
-            )
-            variation_metrics[f"color_{color}_relative_difference"] = (
-                (
-                    variation_metrics[f"color_{color}_absolute_difference"]
-                    / sel_color
-                    * 100
-                )
-                if sel_color > 0
-                else 0
+        return pd.DataFrame(
+            {
+                "day": parts[0].str.capitalize(),
+                "time": time_part,
+                "category": category.to_numpy(),
+            }
+        ).fillna("Unknown")
+
+    def match_locations(self, selenium_df, playwright_df):
+        """Pair each Selenium location with a Playwright one at the same coordinates"""
+        kd_tree = kd_tree_class()
+        if kd_tree is None or playwright_df.empty:
+            # Match on coordinates quantized to MATCH_TOLERANCE degrees, each
+            # Selenium location pairs with the first matching Playwright one
+            for df in (selenium_df, playwright_df):
+                df["key_lat"] = (df["lat"] / MATCH_TOLERANCE).round().astype("int64")
+                df["key_lng"] = (df["lng"] / MATCH_TOLERANCE).round().astype("int64")
+            return selenium_df.merge(
+                playwright_df.drop_duplicates(["key_lat", "key_lng"]),
+                on=["key_lat", "key_lng"],
+                suffixes=("_selenium", "_playwright"),
             )
 
-        return variation_metrics
+        # Nearest Playwright location within MATCH_TOLERANCE on both axes,
+        # repeated coordinates keep their first location as in the merge
+        playwright_df = playwright_df.drop_duplicates(["lat", "lng"])
+        tree = kd_tree(playwright_df[["lat", "lng"]].to_numpy())
+        distance, index = tree.query(
+            selenium_df[["lat", "lng"]].to_numpy(),
+            p=np.inf,
+            distance_upper_bound=MATCH_TOLERANCE,
+        )
+        matched = np.isfinite(distance)
+        return pd.concat(
+            [
+                selenium_df[matched].reset_index(drop=True).add_suffix("_selenium"),
+                playwright_df.iloc[index[matched]]
+                .reset_index(drop=True)
+                .add_suffix("_playwright"),
+            ],
+            axis=1,
+        )
 
     def compare_locations(self):
         """Compare locations between Selenium and Playwright"""
-        selenium_locations = self.extract_location_data(self.selenium_data, "Selenium")
-        playwright_locations = self.extract_location_data(
-            self.playwright_data, "Playwright"
+        # A new comparison invalidates the cached summary
+        self.__dict__.pop("summary", None)
+        selenium_df = self.extract_location_data(
+            self.iter_batches(self.selenium_file, self.selenium_data), "Selenium"
+        )
+        playwright_df = self.extract_location_data(
+            self.iter_batches(self.playwright_file, self.playwright_data), "Playwright"
         )
 
-        # Create DataFrames
-        # df_selenium = pd.DataFrame(selenium_locations)
-        # df_playwright = pd.DataFrame(playwright_locations)
-
-        # Merge on coordinates for comparison
-        comparison_data = []
-        variation_data = []
-
-        for idx, sel_loc in enumerate(selenium_locations):
-            # Find matching Playwright location by coordinates
-            matching_playwright = None
-            for play_loc in playwright_locations:
-                if (
-                    abs(sel_loc["lat"] - play_loc["lat"]) < 0.0001
-                    and abs(sel_loc["lng"] - play_loc["lng"]) < 0.0001
-                ):
-                    matching_playwright = play_loc
-                    break
-
-            if matching_playwright:
-                # Calculate variation metrics
-                variation_metrics = self.calculate_variation_metrics(
-                    sel_loc, matching_playwright
-                )
+        merged = self.match_locations(selenium_df, playwright_df)
+
+        # Calculate variation metrics between Selenium and Playwright, all
+        # score/area/color columns at once into one float32 block laid out
+        # as VARIATION_RESULT_COLUMNS
+        selenium = merged[VARIATION_COLUMNS["selenium"]].to_numpy(np.float32)
+        playwright = merged[VARIATION_COLUMNS["playwright"]].to_numpy(np.float32)
+        variation = np.zeros((len(merged), len(VARIATION_RESULT_COLUMNS)), np.float32)
+        absolute, relative = variation[:, 0::2], variation[:, 1::2]
+        np.subtract(playwright, selenium, out=absolute)
+        np.abs(absolute, out=absolute)
+        np.divide(absolute, selenium, out=relative, where=selenium > 0)
+        relative *= 100
+
+        self.variation_df = pd.DataFrame(variation, columns=VARIATION_RESULT_COLUMNS)
+        self.variation_df["storefront_detection_variation"] = (
+            merged["storefront_found_selenium"] != merged["storefront_found_playwright"]
+        )
+        self.variation_df["storefront_distance_difference"] = (
+            merged["storefront_distance_selenium"]
+            - merged["storefront_distance_playwright"]
+        ).abs()
+
+        comparison_df = merged.rename(
+            columns={
+                "coordinates_selenium": "coordinates",
+                "lat_selenium": "lat",
+                "lng_selenium": "lng",
+                "day_of_week_selenium": "day_of_week",
+                "time_of_day_selenium": "time_of_day",
+                "time_category_selenium": "time_category",
+                "total_pixels_analyzed_selenium": "pixels_selenium",
+                "total_pixels_analyzed_playwright": "pixels_playwright",
+            }
+        )
+        # Scores comparison - Playwright vs Selenium, positive = improvement
+        comparison_df["score_difference"] = (
+            comparison_df["score_playwright"] - comparison_df["score_selenium"]
+        )
+        comparison_df["score_improvement_pct"] = (
+            comparison_df["score_difference"] / comparison_df["score_selenium"] * 100
+        ).where(comparison_df["score_selenium"] > 0, 0)
 
-                comparison = {
-                    "coordinates": sel_loc["coordinates"],
-                    "lat": sel_loc["lat"],
-                    "lng": sel_loc["lng"],
-                    "traffic_type_selenium": sel_loc["traffic_type"],
-                    "traffic_type_playwright": matching_playwright["traffic_type"],
-                    "day_of_week": sel_loc["day_of_week"],
-                    "time_of_day": sel_loc["time_of_day"],
-                    "time_category": sel_loc["time_category"],
-                    # Scores comparison - Playwright vs Selenium
-                    "score_selenium": sel_loc["score"],
-                    "score_playwright": matching_playwright["score"],
-                    "score_difference": matching_playwright["score"]
-                    - sel_loc["score"],  # Positive = improvement
-                    "score_improvement_pct": (
-                        (
-                            (matching_playwright["score"] - sel_loc["score"])
-                            / sel_loc["score"]
-                            * 100
-                        )
-                        if sel_loc["score"] > 0
-                        else 0
-                    ),
-                    # Storefront scores
-                    "storefront_score_selenium": sel_loc["storefront_score"],
-                    "storefront_score_playwright": matching_playwright[
-                        "storefront_score"
-                    ],
-                    "storefront_found_selenium": sel_loc["storefront_found"],
-                    "storefront_found_playwright": matching_playwright[
-                        "storefront_found"
-                    ],
-                    # Area scores
-                    "area_score_selenium": sel_loc["area_score"],
-                    "area_score_playwright": matching_playwright["area_score"],
-                    # Pixel analysis
-                    "pixels_selenium": sel_loc["total_pixels_analyzed"],
-                    "pixels_playwright": matching_playwright["total_pixels_analyzed"],
-                    # Storefront details
-                    "storefront_distance_selenium": sel_loc["storefront_distance"],
-                    "storefront_distance_playwright": matching_playwright[
-                        "storefront_distance"
-                    ],
-                    "storefront_color_selenium": sel_loc["storefront_color"],
-                    "storefront_color_playwright": matching_playwright[
-                        "storefront_color"
-                    ],
-                    # Screenshot URLs
-                    # "screenshot_selenium": sel_loc["screenshot_url"],
-                    # "screenshot_playwright": matching_playwright["screenshot_url"],
-                    # Variation metrics
-                    **variation_metrics,
-                }
-                comparison_data.append(comparison)
-
-                # Collect variation data for summary
-                variation_data.append(variation_metrics)
-
-        self.comparison_df = pd.DataFrame(comparison_data)
-        self.variation_df = pd.DataFrame(variation_data)
-
-        # Create filtered data for analysis
+        self.comparison_df = pd.concat(
+            [comparison_df[COMPARISON_COLUMNS], self.variation_df], axis=1
+        )
+
+        # Traffic type masks per side, computed once and reused by the analysis
+        traffic_selenium = self.comparison_df["traffic_type_selenium"]
+        traffic_playwright = self.comparison_df["traffic_type_playwright"]
+        self.traffic_type_masks = {
+            traffic_type: (
+                (traffic_selenium == traffic_type).to_numpy(),
+                (traffic_playwright == traffic_type).to_numpy(),
+            )
+            for traffic_type in ("typical", "live")
+        }
+        self.traffic_type_match = (traffic_selenium == traffic_playwright).to_numpy()
+
+        # Create filtered data for analysis, read-only so no copies are taken
         self.typical_comparison_df = self.comparison_df[
-            self.comparison_df["traffic_type_selenium"] == "typical"
-        ].copy()
-        self.live_comparison_df = self.comparison_df[
-            self.comparison_df["traffic_type_selenium"] == "live"
-        ].copy()
+            self.traffic_type_masks["typical"][0]
+        ]
+        self.live_comparison_df = self.comparison_df[self.traffic_type_masks["live"][0]]
 
         return self.comparison_df
 
-    def generate_time_analysis(self):
-        """Generate time-based analysis"""
+    def generate_time_analysis(self, by_time=None, by_day=None):
+        """Generate time-based analysis, reusing time/day groupbys when given"""
         if self.comparison_df.empty:
             return {}
 
@@ -366,43 +681,19 @@ class TrafficAnalysisComparator:
             }
         )
 
-        # Time of day analysis
-        time_categories = self.comparison_df["time_category"].value_counts()
-        time_analysis["time_category_distribution"] = time_categories.to_dict()
-
-        # Day of week analysis
-        day_distribution = self.comparison_df["day_of_week"].value_counts()
-        time_analysis["day_distribution"] = day_distribution.to_dict()
-
-        # Performance by time category
-        performance_by_time = (
-            self.comparison_df.groupby("time_category")
-            .agg(
-                {
-                    "score_difference": "mean",
-                    "score_relative_difference": "mean",
-                    "score_selenium": "mean",
-                    "score_playwright": "mean",
-                }
-            )
-            .round(2)
-        )
-        time_analysis["performance_by_time_category"] = performance_by_time.to_dict()
-
-        # Performance by day of week
-        performance_by_day = (
-            self.comparison_df.groupby("day_of_week")
-            .agg(
-                {
-                    "score_difference": "mean",
-                    "score_relative_difference": "mean",
-                    "score_selenium": "mean",
-                    "score_playwright": "mean",
-                }
+        # Time of day and day of week analysis, one aggregation pass per grouping
+        groupbys = {"time_category": by_time, "day_of_week": by_day}
+        for key, (distribution_key, performance_key) in TIME_ANALYSIS_KEYS.items():
+            grouped = groupbys[key]
+            if grouped is None:
+                grouped = self.comparison_df.groupby(key, observed=True, sort=False)
+
+            stats = grouped.agg(**PERFORMANCE_AGGREGATIONS)
+            distribution = stats.pop("count").sort_values(
+                ascending=False, kind="stable"
             )
-            .round(2)
-        )
-        time_analysis["performance_by_day"] = performance_by_day.to_dict()
+            time_analysis[distribution_key] = distribution.to_dict()
+            time_analysis[performance_key] = stats.astype("float64").round(2).to_dict()
 
         return time_analysis
 
@@ -413,70 +704,66 @@ class TrafficAnalysisComparator:
 
         traffic_analysis = {}
 
-        # Traffic type distribution
-        selenium_traffic = self.comparison_df["traffic_type_selenium"].value_counts()
-        playwright_traffic = self.comparison_df[
-            "traffic_type_playwright"
-        ].value_counts()
-
-        traffic_analysis.update(
-            {
-                "selenium_traffic_distribution": selenium_traffic.to_dict(),
-                "playwright_traffic_distribution": playwright_traffic.to_dict(),
-                "traffic_type_consistency": (
-                    self.comparison_df["traffic_type_selenium"]
-                    == self.comparison_df["traffic_type_playwright"]
-                ).mean()
-                * 100,
+        # Traffic type distribution from one bincount over the category codes,
+        # most common first and without unobserved categories
+        for side in ("selenium", "playwright"):
+            column = self.comparison_df[f"traffic_type_{side}"]
+            counts = np.bincount(column.cat.codes, minlength=len(column.cat.categories))
+            order = np.argsort(-counts, kind="stable")
+            traffic_analysis[f"{side}_traffic_distribution"] = {
+                column.cat.categories[i]: int(counts[i]) for i in order if counts[i]
             }
+        traffic_analysis["traffic_type_consistency"] = (
+            self.traffic_type_match.mean() * 100
         )
 
+        # Count and mean scores for every observed traffic type pair in one pass
+        pairs = self.comparison_df.groupby(
+            ["traffic_type_selenium", "traffic_type_playwright"],
+            observed=True,
+            sort=False,
+        ).agg(**TRAFFIC_TYPE_AGGREGATIONS)
+        pair_stats = pairs.to_dict("index")
+
         # Performance by traffic type
-        for traffic_type in ["typical", "live"]:
-            traffic_data = self.comparison_df[
-                (self.comparison_df["traffic_type_selenium"] == traffic_type)
-                & (self.comparison_df["traffic_type_playwright"] == traffic_type)
-            ]
-
-            if len(traffic_data) > 0:
-                traffic_analysis[f"{traffic_type}_locations_count"] = len(traffic_data)
-                traffic_analysis[f"{traffic_type}_avg_score_selenium"] = traffic_data[
-                    "score_selenium"
-                ].mean()
-                traffic_analysis[f"{traffic_type}_avg_score_playwright"] = traffic_data[
-                    "score_playwright"
-                ].mean()
-                traffic_analysis[f"{traffic_type}_score_difference"] = traffic_data[
-                    "score_difference"
-                ].mean()
-                traffic_analysis[f"{traffic_type}_score_difference_pct"] = traffic_data[
-                    "score_improvement_pct"
-                ].mean()
+        for traffic_type in self.traffic_type_masks:
+            stats = pair_stats.get((traffic_type, traffic_type))
+            if stats:
+                for key, value in stats.items():
+                    traffic_analysis[f"{traffic_type}_{key}"] = value
 
         # Traffic type mismatches
-        mismatches = self.comparison_df[
-            self.comparison_df["traffic_type_selenium"]
-            != self.comparison_df["traffic_type_playwright"]
-        ]
-        traffic_analysis["traffic_type_mismatches_count"] = len(mismatches)
+        mismatch_counts = pairs["locations_count"][
+            pairs.index.get_level_values(0) != pairs.index.get_level_values(1)
+        ].sort_values(ascending=False, kind="stable")
+        traffic_analysis["traffic_type_mismatches_count"] = int(mismatch_counts.sum())
         traffic_analysis["traffic_type_mismatches_pct"] = (
-            len(mismatches) / len(self.comparison_df)
+            traffic_analysis["traffic_type_mismatches_count"] / len(self.comparison_df)
         ) * 100
 
-        if len(mismatches) > 0:
-            traffic_analysis["mismatch_details"] = (
-                mismatches[["traffic_type_selenium", "traffic_type_playwright"]]
-                .value_counts()
-                .to_dict()
-            )
+        if len(mismatch_counts) > 0:
+            traffic_analysis["mismatch_details"] = mismatch_counts.to_dict()
 
         return traffic_analysis
 
-    def generate_variation_summary(self):
+    def score_summary(self):
+        """Score means, maxima and improvement/variation counts in one pass"""
+        results = summarize_scores(
+            *(
+                self.comparison_df[column].to_numpy(np.float64)
+                for column in SCORE_SUMMARY_COLUMNS
+            )
+        )
+        return dict(zip(SCORE_SUMMARY_KEYS, results))
+
+    def generate_variation_summary(self, scores=None):
         """Generate comprehensive variation analysis summary"""
         if self.variation_df.empty:
             return {}
 
+        if scores is None:
+            scores = self.score_summary()
+
         variation_summary = {
             # Overall variation metrics
             "mean_absolute_difference_score": self.variation_df[
@@ -533,18 +820,9 @@ class TrafficAnalysisComparator:
                 "color_gray_absolute_difference"
             ].mean(),
             # Variation distribution
-            "low_variation_locations": len(
-                self.variation_df[self.variation_df["score_relative_difference"] < 10]
-            ),
-            "medium_variation_locations": len(
-                self.variation_df[
-                    (self.variation_df["score_relative_difference"] >= 10)
-                    & (self.variation_df["score_relative_difference"] < 25)
-                ]
-            ),
-            "high_variation_locations": len(
-                self.variation_df[self.variation_df["score_relative_difference"] >= 25]
-            ),
+            "low_variation_locations": scores["low_variation_locations"],
+            "medium_variation_locations": scores["medium_variation_locations"],
+            "high_variation_locations": scores["high_variation_locations"],
             # Consistency metrics
             "consistency_score_based": 100
             - self.variation_df["score_relative_difference"].mean(),
@@ -554,13 +832,24 @@ class TrafficAnalysisComparator:
 
         return variation_summary
 
+    @cached_property
+    def summary(self):
+        """Summary statistics, computed once per compare_locations run"""
+        return self.generate_summary_stats()
+
     def generate_summary_stats(self):
         """Generate comprehensive summary statistics"""
         if self.comparison_df.empty:
             return {}
 
-        variation_summary = self.generate_variation_summary()
-        time_analysis = self.generate_time_analysis()
+        scores = self.score_summary()
+        variation_summary = self.generate_variation_summary(scores)
+        time_analysis = self.generate_time_analysis(
+            by_time=self.comparison_df.groupby(
+                "time_category", observed=True, sort=False
+            ),
+            by_day=self.comparison_df.groupby("day_of_week", observed=True, sort=False),
+        )
         traffic_analysis = self.generate_traffic_type_analysis()
 
         # Calculate typical traffic statistics
@@ -580,12 +869,10 @@ class TrafficAnalysisComparator:
             "total_locations_compared": len(self.comparison_df),
             "comparison_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             # Score statistics - Playwright vs Selenium
-            "avg_score_selenium": self.comparison_df["score_selenium"].mean(),
-            "avg_score_playwright": self.comparison_df["score_playwright"].mean(),
-            "avg_score_improvement": self.comparison_df["score_difference"].mean(),
-            "avg_score_improvement_pct": self.comparison_df[
-                "score_improvement_pct"
-            ].mean(),
+            "avg_score_selenium": scores["avg_score_selenium"],
+            "avg_score_playwright": scores["avg_score_playwright"],
+            "avg_score_improvement": scores["avg_score_improvement"],
+            "avg_score_improvement_pct": scores["avg_score_improvement_pct"],
             # Storefront detection
             "storefront_detected_selenium": self.comparison_df[
                 "storefront_found_selenium"
@@ -598,27 +885,17 @@ class TrafficAnalysisComparator:
             ].sum()
             - self.comparison_df["storefront_found_selenium"].sum(),
             # Performance metrics
-            "locations_with_improvement": len(
-                self.comparison_df[self.comparison_df["score_difference"] > 0]
-            ),
-            "locations_with_degradation": len(
-                self.comparison_df[self.comparison_df["score_difference"] < 0]
-            ),
-            "locations_unchanged": len(
-                self.comparison_df[self.comparison_df["score_difference"] == 0]
-            ),
+            "locations_with_improvement": scores["locations_with_improvement"],
+            "locations_with_degradation": scores["locations_with_degradation"],
+            "locations_unchanged": scores["locations_unchanged"],
             # Best improvements
-            "max_improvement": self.comparison_df["score_difference"].max(),
-            "max_improvement_pct": self.comparison_df["score_improvement_pct"].max(),
+            "max_improvement": scores["max_improvement"],
+            "max_improvement_pct": scores["max_improvement_pct"],
             # Traffic type breakdown
             "typical_locations_count": typical_locations,
             "typical_improvement": typical_improvement,
             "typical_improvement_pct": typical_improvement_pct,
-            "live_locations_count": len(
-                self.comparison_df[
-                    self.comparison_df["traffic_type_selenium"] == "live"
-                ]
-            ),
+            "live_locations_count": len(self.live_comparison_df),
             # Variation metrics
             **variation_summary,
             # Time analysis
@@ -629,111 +906,241 @@ class TrafficAnalysisComparator:
 
         return summary
 
-    def generate_pagination_script(self, total_pages, items_per_page=10):
-        """Generate JavaScript for pagination"""
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def generate_pagination_script(total_pages, items_per_page=10):
+        """Generate JavaScript for pagination, memoized per page layout"""
         return f"""
         <script>
             let currentPage = 1;
             const itemsPerPage = {items_per_page};
             const totalPages = {total_pages};
-            
+            const trendArrows = {json.dumps(TREND_ARROW_CHOICES.tolist())};
+
+            // Page 1 is rendered inline, later pages are built on demand from
+            // the ROW_DATA_COLUMNS arrays in #locationRows
+            let tableBody = null;
+            let firstPage = '';
+            let locationRows = [];
+            let pageButtons = [];
+
+            function trendArrow(value) {{
+                return trendArrows[(value > 0.1) - (value < -0.1) + (value > 0) - (value < 0) + 2];
+            }}
+
+            function trafficBadge(trafficType) {{
+                const badgeClass = trafficType === 'typical' ? 'traffic-typical' : 'traffic-live';
+                return `<span class="traffic-badge ${{badgeClass}}">${{trafficType[0].toUpperCase()}}</span>`;
+            }}
+
+            function renderRow(row) {{
+                const [coordinates, day, time, category, trafficSelenium, trafficPlaywright,
+                    scoreSelenium, scorePlaywright, difference, improvementPct,
+                    foundSelenium, foundPlaywright, variation] = row;
+                const improvementClass = difference > 0 ? 'improvement-positive' : difference < 0 ? 'improvement-negative' : '';
+                const variationClass = variation < 10 ? 'variation-low' : variation < 25 ? 'variation-medium' : 'variation-high';
+                return `
+                        <tr>
+                            <td>${{coordinates}}</td>
+                            <td>
+                                <div>${{day}}</div>
+                                <div class="time-badge">${{time}} (${{category}})</div>
+                            </td>
+                            <td>
+                                ${{trafficBadge(trafficSelenium)}} /
+                                ${{trafficBadge(trafficPlaywright)}}
+                            </td>
+                            <td>${{scoreSelenium.toFixed(2)}}</td>
+                            <td>${{scorePlaywright.toFixed(2)}}</td>
+                            <td class="${{improvementClass}}">${{trendArrow(difference)}} ${{difference.toFixed(2)}}</td>
+                            <td class="${{improvementClass}}">${{trendArrow(improvementPct / 100)}} ${{improvementPct.toFixed(1)}}%</td>
+                            <td>${{foundSelenium ? '✅' : '❌'}} / ${{foundPlaywright ? '✅' : '❌'}}</td>
+                            <td class="${{variationClass}}">${{variation.toFixed(1)}}%</td>
+                        </tr>`;
+            }}
+
             function showPage(page) {{
                 currentPage = page;
-                const rows = document.querySelectorAll('#locationsTable tbody tr');
-                const startIndex = (page - 1) * itemsPerPage;
-                const endIndex = startIndex + itemsPerPage;
-                
-                rows.forEach((row, index) => {{
-                    if (index >= startIndex && index < endIndex) {{
-                        row.style.display = '';
-                    }} else {{
-                        row.style.display = 'none';
-                    }}
-                }});
-                
+                if (page === 1) {{
+                    tableBody.innerHTML = firstPage;
+                }} else {{
+                    const startIndex = (page - 2) * itemsPerPage;
+                    tableBody.innerHTML = locationRows
+                        .slice(startIndex, startIndex + itemsPerPage)
+                        .map(renderRow)
+                        .join('');
+                }}
+
                 updatePaginationButtons();
                 updatePageInfo();
             }}
-            
+
             function updatePaginationButtons() {{
                 document.getElementById('prevBtn').disabled = currentPage === 1;
                 document.getElementById('nextBtn').disabled = currentPage === totalPages;
-                
+
                 // Update active page button
-                document.querySelectorAll('.page-btn').forEach(btn => {{
-                    btn.classList.remove('active');
-                    if (parseInt(btn.textContent) === currentPage) {{
-                        btn.classList.add('active');
-                    }}
+                pageButtons.forEach(btn => {{
+                    btn.classList.toggle('active', parseInt(btn.textContent) === currentPage);
                 }});
             }}
-            
+
             function updatePageInfo() {{
                 document.getElementById('pageInfo').textContent = `Page ${{currentPage}} of ${{totalPages}}`;
             }}
-            
+
             function nextPage() {{
                 if (currentPage < totalPages) {{
                     showPage(currentPage + 1);
                 }}
             }}
-            
+
             function prevPage() {{
                 if (currentPage > 1) {{
                     showPage(currentPage - 1);
                 }}
             }}
-            
+
             // Initialize pagination
             document.addEventListener('DOMContentLoaded', function() {{
+                tableBody = document.querySelector('#locationsTable tbody');
+                firstPage = tableBody.innerHTML;
+                locationRows = JSON.parse(document.getElementById('locationRows').textContent);
+                pageButtons = Array.from(document.querySelectorAll('.page-btn'));
                 showPage(1);
             }});
         </script>
         """
 
-    def generate_pagination_controls(self, total_pages, current_page=1):
-        """Generate HTML for pagination controls"""
-        pages_html = '<div class="pagination-controls">'
-        pages_html += (
-            f'<span id="pageInfo" class="page-info">Page 1 of {total_pages}</span>'
-        )
-        pages_html += '<div class="pagination-buttons">'
-        pages_html += '<button id="prevBtn" class="page-nav" onclick="prevPage()">‹ Previous</button>'
-
+    def generate_row_data(self, rows):
+        """Serialize table rows as compact JSON arrays of ROW_DATA_COLUMNS values"""
+        records = zip(*(self._row_values(rows[column]) for column in ROW_DATA_COLUMNS))
+        # Escape "</" so the payload cannot close its <script> element
+        return json.dumps(list(records), separators=(",", ":")).replace("</", "<\\/")
+
+    @staticmethod
+    def _row_values(column):
+        """Column values for the row payload, float32 ones without widening noise"""
+        if column.dtype == np.float32:
+            # Shortest repr that round-trips the float32, 20.07 not
+            # 20.06999969482422, so toFixed and thresholds see the same value
+            return column.to_numpy().astype(str).astype(np.float64).tolist()
+        return column.tolist()
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def generate_pagination_controls(total_pages, current_page=1):
+        """Generate HTML for pagination controls, memoized per page layout"""
         # Show page numbers (max 7 pages visible)
         start_page = max(1, current_page - 3)
         end_page = min(total_pages, start_page + 6)
 
-        for page in range(1, total_pages + 1):
-            if (
-                page == 1
-                or page == total_pages
-                or (page >= start_page and page <= end_page)
-            ):
+        parts = [
+            '<div class="pagination-controls">',
+            f'<span id="pageInfo" class="page-info">Page 1 of {total_pages}</span>',
+            '<div class="pagination-buttons">',
+            '<button id="prevBtn" class="page-nav" onclick="prevPage()">‹ Previous</button>',
+        ]
+        # Only the first/last page, the window and its ellipsis neighbours render
+        window = range(max(1, start_page - 1), min(total_pages, end_page + 1) + 1)
+        pages = sorted({1, total_pages, *window}) if total_pages > 0 else []
+        for page in pages:
+            if page == 1 or page == total_pages or start_page <= page <= end_page:
                 active_class = "active" if page == current_page else ""
-                pages_html += f'<button class="page-btn {active_class}" onclick="showPage({page})">{page}</button>'
+                parts.append(
+                    f'<button class="page-btn {active_class}" onclick="showPage({page})">{page}</button>'
+                )
             elif page == start_page - 1 or page == end_page + 1:
-                pages_html += '<span class="page-ellipsis">...</span>'
-
-        pages_html += (
+                parts.append('<span class="page-ellipsis">...</span>')
+        parts.append(
             '<button id="nextBtn" class="page-nav" onclick="nextPage()">Next ›</button>'
         )
-        pages_html += "</div></div>"
+        parts.append("</div></div>")
 
-        return pages_html
+        return "".join(parts)
 
     def get_trend_arrow(self, value, threshold=0.1):
         """Get trend arrow based on value difference"""
-        if value > threshold:
-            return "🟢 ↑"  # Significant improvement
-        elif value < -threshold:
-            return "🔴 ↓"  # Significant degradation
-        elif value > 0:
-            return "↗️"  # Slight improvement
-        elif value < 0:
-            return "↘️"  # Slight degradation
-        else:
-            return "➡️"  # No change
+        # Sign plus sign-beyond-threshold gives the TREND_ARROWS key
+        return TREND_ARROWS[
+            bool(value > threshold)
+            - bool(value < -threshold)
+            + bool(value > 0)
+            - bool(value < 0)
+        ]
+
+    def trend_arrows(self, values, threshold=0.1):
+        """Vectorized get_trend_arrow over a Series of value differences"""
+        values = np.asarray(values)
+        key = (
+            (values > threshold).astype(np.int8)
+            - (values < -threshold)
+            + (values > 0)
+            - (values < 0)
+        )
+        return TREND_ARROW_CHOICES[key + 2]
+
+    def generate_table_rows(self, df):
+        """Render detailed comparison table rows, one HTML string per row"""
+        improvement_class = np.select(
+            [df["score_difference"] > 0, df["score_difference"] < 0],
+            ["improvement-positive", "improvement-negative"],
+            "",
+        )
+        variation_class = np.select(
+            [
+                df["score_relative_difference"] < 10,
+                df["score_relative_difference"] < 25,
+            ],
+            ["variation-low", "variation-medium"],
+            "variation-high",
+        )
+        traffic_class, traffic_letter, found = {}, {}, {}
+        for side in ("selenium", "playwright"):
+            # Badges are looked up once per category, not compared per row
+            codes = df[f"traffic_type_{side}"].cat.codes.to_numpy()
+            traffic_class[side] = TRAFFIC_BADGE_CLASSES[codes]
+            traffic_letter[side] = TRAFFIC_BADGE_LETTERS[codes]
+            found[side] = np.where(df[f"storefront_found_{side}"], "✅", "❌")
+
+        # One column per ROW_TEMPLATE slot, in slot order
+        cells = pd.DataFrame(
+            {
+                "coordinates": df["coordinates"],
+                "day_of_week": df["day_of_week"],
+                "time_of_day": df["time_of_day"],
+                "time_category": df["time_category"],
+                "traffic_class_selenium": traffic_class["selenium"],
+                "traffic_selenium": traffic_letter["selenium"],
+                "traffic_class_playwright": traffic_class["playwright"],
+                "traffic_playwright": traffic_letter["playwright"],
+                "score_selenium": df["score_selenium"],
+                "score_playwright": df["score_playwright"],
+                "difference_class": improvement_class,
+                "difference_arrow": self.trend_arrows(df["score_difference"]),
+                "score_difference": df["score_difference"],
+                "improvement_class": improvement_class,
+                "improvement_arrow": self.trend_arrows(
+                    df["score_improvement_pct"] / 100
+                ),
+                "score_improvement_pct": df["score_improvement_pct"],
+                "found_selenium": found["selenium"],
+                "found_playwright": found["playwright"],
+                "variation_class": variation_class,
+                "score_relative_difference": df["score_relative_difference"],
+            }
+        )
+        return [ROW_TEMPLATE % row for row in cells.itertuples(index=False, name=None)]
+
+    def generate_performance_html(self, distribution, performance):
+        """Render one score difference/variation line per distribution group"""
+        score_difference = performance["score_difference"]
+        relative_difference = performance["score_relative_difference"]
+        return "".join(
+            f"<p><strong>{group}:</strong> Diff: {score_difference.get(group, 0):.2f}, "
+            f"Var: {relative_difference.get(group, 0):.1f}%</p>"
+            for group in distribution
+        )
 
     def generate_html_report(self, output_file="traffic_comparison_report.html"):
         """Generate comprehensive HTML report with all comparisons"""
@@ -741,58 +1148,41 @@ class TrafficAnalysisComparator:
             print("No comparison data available. Run compare_locations() first.")
             return
 
-        summary = self.generate_summary_stats()
+        summary = self.summary
 
         # Calculate pagination
         items_per_page = 10
-        total_pages = math.ceil(len(self.comparison_df) / items_per_page)
+        total_pages = -(-len(self.comparison_df) // items_per_page)
+        pagination_controls = self.generate_pagination_controls(total_pages)
+
+        # Analysis card fragments, rendered once ahead of the header template
+        time_distribution = summary.get("time_category_distribution", {})
+        day_distribution = summary.get("day_distribution", {})
+        perf_time_html = self.generate_performance_html(
+            time_distribution, summary["performance_by_time_category"]
+        )
+        perf_day_html = self.generate_performance_html(
+            day_distribution, summary["performance_by_day"]
+        )
+        time_dist_html = ", ".join(f"{k} ({v})" for k, v in time_distribution.items())
+        day_dist_html = ", ".join(f"{k} ({v})" for k, v in day_distribution.items())
+        mismatch_html = (
+            ", ".join(
+                f"{k[0]}→{k[1]} ({v})" for k, v in summary["mismatch_details"].items()
+            )
+            if summary.get("mismatch_details")
+            else "None"
+        )
 
-        # Create HTML content
-        html_content = f"""
+        # Report head, summary sections and the table header
+        header = f"""
         <!DOCTYPE html>
         <html lang="en">
         <head>
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
             <title>Google Maps Traffic Analysis Comparison Report</title>
-            <style>
-                body {{ font-family: 'Arial', 'Segoe UI', Tahoma, sans-serif; margin: 20px; background-color: #f5f5f5; }}
-                .container {{ max-width: 1400px; margin: 0 auto; background: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                .header {{ text-align: center; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px; margin-bottom: 20px; }}
-                .summary {{ background: #f8f9fa; padding: 20px; border-radius: 8px; margin-bottom: 20px; }}
-                .metric-card {{ background: white; padding: 15px; margin: 10px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); display: inline-block; width: calc(25% - 40px); min-width: 200px; text-align: center; }}
-                .metric-value {{ font-size: 24px; font-weight: bold; color: #333; }}
-                .metric-label {{ font-size: 14px; color: #666; }}
-                .improvement-positive {{ color: #28a745; }}
-                .improvement-negative {{ color: #dc3545; }}
-                .variation-high {{ color: #dc3545; background-color: #ffe6e6; }}
-                .variation-medium {{ color: #ffc107; background-color: #fff9e6; }}
-                .variation-low {{ color: #28a745; background-color: #e6ffe6; }}
-                table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-                th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-                th {{ background-color: #f8f9fa; font-weight: bold; text-align: center; }}
-                tr:hover {{ background-color: #f5f5f5; }}
-                .screenshot-cell {{ max-width: 200px; }}
-                .screenshot-img {{ max-width: 150px; max-height: 100px; border: 1px solid #ddd; border-radius: 4px; }}
-                .section-title {{ background: #e9ecef; padding: 15px; border-radius: 8px; margin: 30px 0 15px 0; border-left: 5px solid #667eea; }}
-                .variation-metrics {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 15px; margin: 20px 0; }}
-                .variation-metric-card {{ background: white; padding: 15px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); border-left: 4px solid #6c757d; }}
-                .pagination-controls {{ display: flex; justify-content: space-between; align-items: center; margin: 20px 0; padding: 10px; background: #f8f9fa; border-radius: 8px; }}
-                .pagination-buttons {{ display: flex; gap: 5px; }}
-                .page-btn, .page-nav {{ padding: 8px 12px; border: 1px solid #ddd; background: white; cursor: pointer; border-radius: 4px; }}
-                .page-btn.active {{ background: #667eea; color: white; border-color: #667eea; }}
-                .page-btn:hover, .page-nav:hover {{ background: #e9ecef; }}
-                .page-nav:disabled {{ background: #f8f9fa; color: #6c757d; cursor: not-allowed; }}
-                .page-info {{ font-weight: bold; color: #495057; }}
-                .traffic-badge {{ padding: 4px 8px; border-radius: 12px; font-size: 12px; font-weight: bold; }}
-                .traffic-typical {{ background: #d4edda; color: #155724; }}
-                .traffic-live {{ background: #f8d7da; color: #721c24; }}
-                .trend-arrow {{ font-size: 16px; margin-right: 5px; }}
-                .page-ellipsis {{ padding: 8px 4px; color: #6c757d; }}
-                .time-badge {{ padding: 4px 8px; border-radius: 12px; font-size: 11px; font-weight: bold; background: #e9ecef; color: #495057; }}
-                .analysis-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; margin: 20px 0; }}
-                .analysis-card {{ background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }}
-            </style>
+            <style>{REPORT_CSS}</style>
         </head>
         <body>
             <div class="container">
@@ -904,7 +1294,7 @@ class TrafficAnalysisComparator:
                         <h3>Traffic Type Mismatches</h3>
                         <p><strong>Mismatches:</strong> {summary['traffic_type_mismatches_count']} locations</p>
                         <p><strong>Percentage:</strong> {summary['traffic_type_mismatches_pct']:.1f}%</p>
-                        <p><strong>Details:</strong> {', '.join([f'{k[0]}→{k[1]} ({v})' for k, v in summary.get('mismatch_details', {}).items()]) if summary.get('mismatch_details') else 'None'}</p>
+                        <p><strong>Details:</strong> {mismatch_html}</p>
                     </div>
                 </div>
 
@@ -915,18 +1305,16 @@ class TrafficAnalysisComparator:
                 <div class="analysis-grid">
                     <div class="analysis-card">
                         <h3>Performance by Time of Day</h3>
-                        {"".join([f"<p><strong>{category}:</strong> Diff: {summary['performance_by_time_category']['score_difference'].get(category, 0):.2f}, Var: {summary['performance_by_time_category']['score_relative_difference'].get(category, 0):.1f}%</p>" 
-                                 for category in summary.get('time_category_distribution', {}).keys()])}
+                        {perf_time_html}
                     </div>
                     <div class="analysis-card">
                         <h3>Performance by Day of Week</h3>
-                        {"".join([f"<p><strong>{day}:</strong> Diff: {summary['performance_by_day']['score_difference'].get(day, 0):.2f}, Var: {summary['performance_by_day']['score_relative_difference'].get(day, 0):.1f}%</p>" 
-                                 for day in summary.get('day_distribution', {}).keys()])}
+                        {perf_day_html}
                     </div>
                     <div class="analysis-card">
                         <h3>Time Distribution</h3>
-                        <p><strong>Time Categories:</strong> {', '.join([f'{k} ({v})' for k, v in summary.get('time_category_distribution', {}).items()])}</p>
-                        <p><strong>Days of Week:</strong> {', '.join([f'{k} ({v})' for k, v in summary.get('day_distribution', {}).items()])}</p>
+                        <p><strong>Time Categories:</strong> {time_dist_html}</p>
+                        <p><strong>Days of Week:</strong> {day_dist_html}</p>
                     </div>
                 </div>
 
@@ -972,7 +1360,7 @@ class TrafficAnalysisComparator:
                     <h2>🔍 Detailed Location Comparison</h2>
                 </div>
                 
-                {self.generate_pagination_controls(total_pages)}
+                {pagination_controls}
                 
                 <table id="locationsTable">
                     <thead>
@@ -991,93 +1379,36 @@ class TrafficAnalysisComparator:
                     <tbody>
         """
 
-        # Add table rows
-        for _, row in self.comparison_df.iterrows():
-            improvement_class = (
-                "improvement-positive"
-                if row["score_difference"] > 0
-                else "improvement-negative" if row["score_difference"] < 0 else ""
-            )
-            variation_class = (
-                "variation-low"
-                if row["score_relative_difference"] < 10
-                else (
-                    "variation-medium"
-                    if row["score_relative_difference"] < 25
-                    else "variation-high"
-                )
-            )
-            traffic_selenium_class = (
-                "traffic-typical"
-                if row["traffic_type_selenium"] == "typical"
-                else "traffic-live"
-            )
-            traffic_playwright_class = (
-                "traffic-typical"
-                if row["traffic_type_playwright"] == "typical"
-                else "traffic-live"
-            )
-
-            html_content += f"""
-                        <tr>
-                            <td>{row['coordinates']}</td>
-                            <td>
-                                <div>{row['day_of_week']}</div>
-                                <div class="time-badge">{row['time_of_day']} ({row['time_category']})</div>
-                            </td>
-                            <td>
-                                <span class="traffic-badge {traffic_selenium_class}">{row['traffic_type_selenium'][0].upper()}</span> / 
-                                <span class="traffic-badge {traffic_playwright_class}">{row['traffic_type_playwright'][0].upper()}</span>
-                            </td>
-                            <td>{row['score_selenium']:.2f}</td>
-                            <td>{row['score_playwright']:.2f}</td>
-                            <td class="{improvement_class}">{self.get_trend_arrow(row['score_difference'])} {row['score_difference']:.2f}</td>
-                            <td class="{improvement_class}">{self.get_trend_arrow(row['score_improvement_pct']/100)} {row['score_improvement_pct']:.1f}%</td>
-                            <td>{'✅' if row['storefront_found_selenium'] else '❌'} / {'✅' if row['storefront_found_playwright'] else '❌'}</td>
-                            <td class="{variation_class}">{row['score_relative_difference']:.1f}%</td>
-                        </tr>
-            """
-
-        html_content += """
-                    </tbody>
-                </table>
-                {generate_pagination_controls}
-                <div style="margin-top: 30px; padding: 20px; background: #f8f9fa; border-radius: 8px;">
-                    <h3>🎯 Key Findings & Observations</h3>
-                    <ul>
-                        <li>Playwright showed higher scores in <strong>{improved_locations}</strong> out of <strong>{total_locations}</strong> locations</li>
-                        <li>Processing time: Playwright is <strong>{time_comparison}</strong> by <strong>{time_diff_abs:.1f}s ({time_diff_pct_abs:.1f}%)</strong></li>
-                        <li>Maximum score difference: <strong>{max_imp:.2f}</strong> points</li>
-                        <li>Storefront detection differed in <strong>{store_imp}</strong> locations</li>
-                        <li>Traffic type consistency: <strong>{traffic_consistency:.1f}%</strong></li>
-                        <li>Average score variation: <strong>{mean_variation_pct:.1f}%</strong></li>
-                        <li>Overall consistency: <strong>{overall_consistency:.1f}%</strong></li>
-                    </ul>
-                </div>
-            </div>
-            {generate_pagination_script}
-        </body>
-        </html>
-        """.format(
-            generate_pagination_controls=self.generate_pagination_controls(total_pages),
-            generate_pagination_script=self.generate_pagination_script(
+        footer = REPORT_FOOTER.safe_substitute(
+            pagination_controls=pagination_controls,
+            row_data=self.generate_row_data(self.comparison_df.iloc[items_per_page:]),
+            pagination_script=self.generate_pagination_script(
                 total_pages, items_per_page
             ),
             improved_locations=summary["locations_with_improvement"],
             total_locations=summary["total_locations_compared"],
             time_comparison=summary["processing_time_comparison"].lower(),
-            time_diff_abs=abs(summary["processing_time_difference"]),
-            time_diff_pct_abs=abs(summary["processing_time_difference_pct"]),
-            max_imp=summary["max_improvement"],
+            time_diff_abs=f"{abs(summary['processing_time_difference']):.1f}",
+            time_diff_pct_abs=f"{abs(summary['processing_time_difference_pct']):.1f}",
+            max_imp=f"{summary['max_improvement']:.2f}",
             store_imp=summary["storefront_detection_improvement"],
-            traffic_consistency=summary["traffic_type_consistency"],
-            mean_variation_pct=summary["mean_relative_difference_score"],
-            overall_consistency=summary["consistency_score_based"],
+            traffic_consistency=f"{summary['traffic_type_consistency']:.1f}",
+            mean_variation_pct=f"{summary['mean_relative_difference_score']:.1f}",
+            overall_consistency=f"{summary['consistency_score_based']:.1f}",
         )
 
-        # Write HTML file
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(html_content)
+        # Stream the HTML file, only the first page of rows is rendered here.
+        # A .gz output file is written gzip-compressed
+        if output_file.endswith(".gz"):
+            f = gzip.open(output_file, "wt", encoding="utf-8", compresslevel=1)
+        else:
+            f = open(output_file, "w", encoding="utf-8", buffering=1 << 20)
+        with f:
+            f.write(header)
+            f.writelines(
+                self.generate_table_rows(self.comparison_df.iloc[:items_per_page])
+            )
+            f.write(footer)
 
         print(f"HTML report generated: {output_file}")
 
@@ -1191,7 +1522,7 @@ class TrafficAnalysisComparator:
         # self.generate_csv_report(csv_output)
 
         # Print quick summary to console
-        summary = self.generate_summary_stats()
+        summary = self.summary
         print(f"\n=== COMPREHENSIVE COMPARISON SUMMARY ===")
         print(f"Locations compared: {summary['total_locations_compared']}")
         print(f"Average Selenium score: {summary['avg_score_selenium']:.2f}")
@@ -12,10 +12,16 @@ SECRET_KEY = os.getenv("JWT_SECRET", "jwt_secret")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 RATE = os.getenv("RATE_LIMIT", "5/minute")
+# Shared rate limit counters across uvicorn workers, e.g. redis://localhost:6379
+RATE_LIMIT_STORAGE = os.getenv("REDIS_URL", "memory://")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "123456").strip()
 
 # DataBase configuration
 DB_FILE = os.getenv("SQLITE_DB_FILE", "traffic.db")
 DB_URL = f"sqlite+aiosqlite:///{DB_FILE}"  # f"sqlite:///{DB_FILE}"
+# Traffic log coordinates are stored and matched at this precision to
+# dodge float misses, see round_coordinates.py for older rows
+COORD_DECIMALS = 6
 
 # Proxy Settings
 PROXY_SERVER = os.getenv("PLAYWRIGHT_PROXY_SERVER")
@@ -23,8 +29,22 @@ PROXY_BYPASS = os.getenv("PLAYWRIGHT_PROXY_BYPASS")
 PROXY_USERNAME = os.getenv("PLAYWRIGHT_PROXY_USERNAME")
 PROXY_PASSWORD = os.getenv("PLAYWRIGHT_PROXY_PASSWORD")
 
-# Configure logger
+# Local CDP port of the Chromium shared by all workers, 0 picks a free one
+BROWSER_CDP_PORT = int(os.getenv("PLAYWRIGHT_CDP_PORT", "0"))
+# Saved cookie consent, reused by new browser contexts while fresh
+COOKIE_STATE_PATH = os.getenv("PLAYWRIGHT_STATE_FILE", "storage_state.json")
+COOKIE_STATE_MAX_AGE = 24 * 60 * 60  # seconds
+# Pages each worker renders at once on the shared browser
+MAX_PARALLEL_PAGES = int(os.getenv("MAX_PARALLEL_PAGES", "4"))
+# Seconds a request waits on a worker result before giving up on the job
+JOB_TIMEOUT = int(os.getenv("JOB_TIMEOUT", "180"))
+# V8 old-space cap per renderer, bounds memory growth of long-lived browsers
+BROWSER_JS_HEAP_MB = int(os.getenv("PLAYWRIGHT_JS_HEAP_MB", "256"))
+
+# Configure logger. basicConfig is a no-op when the root logger already has
+# handlers, so the app logger sets its own level rather than relying on it
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger("traffic_api")
+logger.setLevel(logging.INFO)
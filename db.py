@@ -1,12 +1,27 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
+import asyncio
+
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from config import DB_URL
 
-engine = create_async_engine(DB_URL, echo=False, future=True)
+DB_POOL_SIZE = 20
+
+# Sized for concurrent /process-* requests, LIFO keeps the hot connections warm
+engine = create_async_engine(
+    DB_URL,
+    echo=False,
+    future=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=40,
+    pool_use_lifo=True,
+)
 AsyncSessionLocal = async_sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
@@ -15,7 +30,17 @@ Base = declarative_base()
 
 async def get_db():
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
+
+
+async def _ping():
+    async with engine.connect() as conn:
+        await conn.execute(select(1))
+
+
+async def warm_pool():
+    """
+    Open DB_POOL_SIZE connections up front so the first burst of requests
+    doesn't pay for the connects.
+    """
+    await asyncio.gather(*(_ping() for _ in range(DB_POOL_SIZE)))
@@ -5,26 +5,43 @@
 import asyncio
 import multiprocessing as mp
 import os
-import uuid
+import time
 from contextlib import asynccontextmanager
 from datetime import timedelta
 from pathlib import Path
+from typing import Optional
 
+import anyio
+import orjson
 from fastapi import Depends, FastAPI, HTTPException, Request
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
+from playwright.async_api import async_playwright
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.util import get_remote_address
-from sqlalchemy import select
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.util import md5_hex
 
-from auth import authenticate_user, create_access_token, get_current_user
-from config import ACCESS_TOKEN_EXPIRE_MINUTES, RATE, logger
-from db import Base, engine, get_db
+from auth import (
+    authenticate_user,
+    create_access_token,
+    get_current_user,
+    hash_password,
+)
+from config import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    ADMIN_PASSWORD,
+    BROWSER_CDP_PORT,
+    COORD_DECIMALS,
+    RATE,
+    RATE_LIMIT_STORAGE,
+    logger,
+)
+from db import AsyncSessionLocal, Base, engine, get_db, warm_pool
 from models import (
     LocationData,
     LocationRequest,
@@ -35,6 +52,7 @@ from models import (
 )
 from models_db import Job, TrafficLog, User
 from playwright_traffic_analysis import TRAFFIC_SCREENSHOTS_STATIC_PATH
+from traffic_worker import free_port, launch_browser
 from worker_pool import WorkerPool
 
 POOL = WorkerPool(
@@ -42,35 +60,77 @@ POOL = WorkerPool(
 )  # num_workers = default to cpu_count(), for best performance and results quality
 
 # FastAPI app
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=RATE_LIMIT_STORAGE,
+    strategy="moving-window",
+    in_memory_fallback_enabled=True,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    os.makedirs(TRAFFIC_SCREENSHOTS_STATIC_PATH, exist_ok=True)
-
-    # Create database tables
+    for dir_path in (
+        "static/images/traffic_screenshots",
+        TRAFFIC_SCREENSHOTS_STATIC_PATH,
+    ):
+        os.makedirs(dir_path, exist_ok=True)
+    # Checked once here, /health reports the stored outcome
+    app.state.fs_error = _probe_file_system()
+
+    # Create database tables and the admin user
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-
-    # Create admin user
-    async for db in get_db():
-        admin_pw = os.getenv("ADMIN_PASSWORD", "123456").strip()
-        result = await db.execute(select(User).filter_by(username="admin"))
-        existing_admin = result.scalar_one_or_none()
-
-        if not existing_admin:
-            db.add(User(username="admin", hashed_password=md5_hex(admin_pw)))
-            await db.commit()
-        break
-
-    POOL.start()
+        # scrypt is slow on purpose, only hash when the admin is missing
+        admin_id = await conn.scalar(select(User.id).where(User.username == "admin"))
+        if admin_id is None:
+            hashed_password = await asyncio.to_thread(hash_password, ADMIN_PASSWORD)
+            await conn.execute(
+                sqlite_insert(User)
+                .values(username="admin", hashed_password=hashed_password)
+                .on_conflict_do_nothing(index_elements=["username"])
+            )
+    await warm_pool()
+
+    # One Chromium shared by all workers over CDP
+    playwright = await async_playwright().start()
+    cdp_port = BROWSER_CDP_PORT or free_port()
+    relaunches = set()
+
+    async def start_browser():
+        try:
+            browser = await launch_browser(playwright, cdp_port=cdp_port)
+        except Exception as e:
+            # Workers fall back to their own browsers, health_checker retries
+            logger.error(f"Failed to launch the shared browser: {e}")
+            return
+        browser.on("disconnected", on_browser_disconnected)
+        app.state.browser = browser
+
+    def relaunch_browser():
+        task = asyncio.create_task(start_browser())
+        relaunches.add(task)
+        task.add_done_callback(relaunches.discard)
+
+    def on_browser_disconnected(_):
+        app.state.browser = None
+        if app.state.browser_closing:
+            return
+        logger.warning("⚠️ Shared browser disconnected. Relaunching...")
+        relaunch_browser()
+
+    app.state.browser = None
+    app.state.browser_closing = False
+    await start_browser()
+    POOL.start(cdp_endpoint=f"http://127.0.0.1:{cdp_port}")
 
     # Background health check
     async def health_checker():
         while True:
             await asyncio.sleep(60)
             POOL.check_health()
+            if app.state.browser is None and not relaunches:
+                relaunch_browser()
 
     health_task = asyncio.create_task(health_checker())
 
@@ -79,6 +139,10 @@ async def lifespan(app: FastAPI):
     health_task.cancel()
     logger.info("🔄 Starting cleanup process...")
     POOL.stop()
+    app.state.browser_closing = True
+    if app.state.browser is not None:
+        await app.state.browser.close()
+    await playwright.stop()
 
 
 app = FastAPI(title="Google Maps Traffic Analyzer API", lifespan=lifespan)
@@ -91,7 +155,26 @@ app.add_exception_handler(
     ),
 )
 
+# One round-trip for the log, its job's request id and saved_to_static flag.
+# Built once with bound parameters so every /fetch-location call reuses the
+# compiled SQL. Day and time use IS so a missing value still matches NULL.
+FETCH_LOCATION_STMT = (
+    select(TrafficLog.result, Job.request_id, Job.saved_to_static)
+    .join(Job)
+    .filter(
+        Job.user_id == bindparam("user_id"),
+        TrafficLog.lat == bindparam("lat"),
+        TrafficLog.lng == bindparam("lng"),
+        TrafficLog.storefront_direction == bindparam("storefront_direction"),
+        TrafficLog.day.is_not_distinct_from(bindparam("day")),
+        TrafficLog.time.is_not_distinct_from(bindparam("time")),
+    )
+    .order_by(TrafficLog.created_at.desc(), TrafficLog.id.desc())
+    .limit(1)
+)
+
 STATIC_ROOT = Path("static").resolve()
+HEALTH_DIRS = ("static", "static/images", "static/images/traffic_screenshots")
 TRAFFIC_SCREENSHOTS_ROOT = Path(TRAFFIC_SCREENSHOTS_STATIC_PATH).resolve()
 
 
@@ -121,9 +204,69 @@ async def serve_static_alias(file_path: str):
     raise HTTPException(status_code=404, detail="File not found")
 
 
-# static directory
-os.makedirs("static/images/traffic_screenshots", exist_ok=True)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+def _probe_file_system() -> Optional[str]:
+    """
+    Write and remove a file in each static directory, returning the error if any.
+    """
+    for dir_path in HEALTH_DIRS:
+        probe = os.path.join(dir_path, f".probe_{os.getpid()}")
+        try:
+            with open(probe, "wb"):
+                pass
+            os.unlink(probe)
+        except OSError as e:
+            return f"Directory not writable: {dir_path} ({e})"
+    return None
+
+
+def _request_id() -> str:
+    """
+    UUIDv7 as 32 hex chars, time-ordered so Job.request_id inserts append
+    to the end of its index.
+    """
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (time.time_ns() // 1_000_000) << 80
+        | 0x7 << 76  # version
+        | (rand >> 62 & 0xFFF) << 64
+        | 0b10 << 62  # variant
+        | rand & ((1 << 62) - 1)
+    )
+    return f"{value:032x}"
+
+
+def _location_key(loc: LocationData) -> tuple:
+    return (loc.lat, loc.lng, loc.day, loc.time, loc.storefront_direction, loc.zoom)
+
+
+def _job_payload(loc: LocationData, save_to_static: bool, base_url: str) -> dict:
+    return {
+        "lat": loc.lat,
+        "lng": loc.lng,
+        "day": loc.day,
+        "time": loc.time,
+        "storefront_direction": loc.storefront_direction,
+        "zoom": loc.zoom,
+        "save_to_static": save_to_static,
+        "base_url": base_url,
+    }
+
+
+def _traffic_log_row(job_id, res: dict) -> dict:
+    loc = res["location"]
+    return {
+        "job_id": job_id,
+        "lat": round(loc["lat"], COORD_DECIMALS),
+        "lng": round(loc["lng"], COORD_DECIMALS),
+        "day": loc.get("day"),
+        "time": loc.get("time"),
+        "result": res["result"],
+        "storefront_direction": loc.get("storefront_direction", "north"),
+    }
+
+
+# static directory, created in lifespan
+app.mount("/static", StaticFiles(directory="static", check_dir=False), name="static")
 
 
 # Global exception handler
@@ -155,61 +298,183 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db=Depends(get
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-@app.post("/process-locations")
-@app.post("/process-many")
+def _dispatch_locations(request: Request, payload: MultiLocationRequest):
+    """
+    Send the batch to the worker pool, identical locations sharing one job.
+    Returns the unique locations by key and their futures, in the same order.
+    """
+    base_url = str(request.base_url).rstrip("/")
+    unique_locations = {}
+    for loc in payload.locations:
+        unique_locations.setdefault(_location_key(loc), loc)
+
+    # Dispatch all jobs to the worker pool at once and get their futures
+    futures = POOL.dispatch_batch(
+        [
+            _job_payload(loc, payload.save_to_static, base_url)
+            for loc in unique_locations.values()
+        ]
+    )
+    return unique_locations, futures
+
+
+async def _save_results(
+    user_id: int,
+    request_id: str,
+    locations_count: int,
+    saved_to_static: bool,
+    results: list,
+):
+    try:
+        # Job and one bulk INSERT for all the traffic logs, one transaction
+        async with AsyncSessionLocal() as db, db.begin():
+            job_id = await db.scalar(
+                insert(Job)
+                .values(
+                    request_id=request_id,
+                    locations_count=locations_count,
+                    completed=len(results),
+                    saved_to_static=saved_to_static,
+                    user_id=user_id,
+                )
+                .returning(Job.id)
+            )
+            rows = [_traffic_log_row(job_id, res) for res in results]
+            if rows:
+                await db.execute(insert(TrafficLog), rows)
+    except Exception as e:
+        logger.warning(f"DB: failed to create process request {request_id}: {e}")
+
+
+def _job_outcome(idx: int, res) -> tuple:
+    """
+    Classify a worker outcome for the location at idx as (result, error).
+    Both are None for a successful job that produced no result.
+    """
+    if isinstance(res, Exception):
+        return None, f"Job {idx} failed: {str(res)}"
+    if not res["ok"]:
+        return None, res["error"]
+    if res.get("result") is None:
+        return None, None
+    return res, None
+
+
+async def _keyed(key: tuple, future: asyncio.Future):
+    try:
+        return key, await future
+    except Exception as e:
+        return key, e
+
+
+@app.post("/process-locations/stream")
 # @limiter.limit(RATE)
-async def process_locations(
+async def process_locations_stream(
     request: Request,
     payload: MultiLocationRequest,
     user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
 ):
+    """
+    Like /process-locations, but writes one NDJSON line per location as soon
+    as its analysis finishes, then a summary line. The request_id is also
+    sent upfront in the X-Request-ID header.
+    """
     if not payload.locations:
         raise HTTPException(status_code=400, detail="No locations provided")
     if len(payload.locations) > 20:
         raise HTTPException(status_code=400, detail="Max 20 locations per request")
 
-    try:
-        futures = []
-        for idx, loc in enumerate(payload.locations):
-            # Dispatch jobs to worker pool and get a future
-            fut = POOL.dispatch(
+    unique_locations, futures = _dispatch_locations(request, payload)
+    indexes = {}
+    for idx, loc in enumerate(payload.locations):
+        indexes.setdefault(_location_key(loc), []).append(idx)
+
+    request_id = _request_id()
+
+    async def lines():
+        completed = []
+        errors = []
+        try:
+            for next_done in asyncio.as_completed(
+                [_keyed(key, fut) for key, fut in zip(unique_locations, futures)]
+            ):
+                key, res = await next_done
+                for idx in indexes[key]:
+                    result, error = _job_outcome(idx, res)
+                    if error:
+                        errors.append(error)
+                        line = {"index": idx, "error": error}
+                    elif result:
+                        completed.append(result)
+                        line = {"index": idx, "result": result["result"]}
+                    else:
+                        line = {"index": idx, "result": None}
+                    yield orjson.dumps(line, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+
+            yield orjson.dumps(
                 {
-                    "lat": loc.lat,
-                    "lng": loc.lng,
-                    "day": loc.day,
-                    "time": loc.time,
-                    "storefront_direction": loc.storefront_direction,
-                    "zoom": loc.zoom,
-                    "save_to_static": payload.save_to_static,
-                    "base_url": str(request.base_url).rstrip("/"),
+                    "request_id": request_id,
+                    "locations_count": len(payload.locations),
+                    "completed": len(completed),
+                    "saved_to_db": payload.save_to_db,
+                    "saved_to_static": payload.save_to_static,
+                    "error": "\n".join(errors) if errors else None,
                 }
-            )
-            futures.append((idx, fut))
+            ) + b"\n"
+        finally:
+            # Stop waiting on jobs the client no longer reads
+            for fut in futures:
+                fut.cancel()
+            # Keep whatever was already sent, even if the client disconnected.
+            # A disconnect cancels this task, so the save runs shielded.
+            if payload.save_to_db:
+                with anyio.CancelScope(shield=True):
+                    await _save_results(
+                        user.id,
+                        request_id,
+                        len(payload.locations),
+                        payload.save_to_static,
+                        completed,
+                    )
 
-        results = {}
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Request-ID": request_id},
+    )
+
+
+@app.post("/process-locations", response_model=MultiLocationResponse)
+@app.post("/process-many", response_model=MultiLocationResponse)
+# @limiter.limit(RATE)
+async def process_locations(
+    request: Request,
+    payload: MultiLocationRequest,
+    user=Depends(get_current_user),
+):
+    if not payload.locations:
+        raise HTTPException(status_code=400, detail="No locations provided")
+    if len(payload.locations) > 20:
+        raise HTTPException(status_code=400, detail="Max 20 locations per request")
+
+    try:
+        unique_locations, futures = _dispatch_locations(request, payload)
+
+        ordered_results = []
         errors = []
 
-        # Wait for all results concurrently
-        for idx, fut in futures:
-            try:
-                res = await fut
-                if res["ok"]:
-                    results[idx] = res
-                else:
-                    errors.append(res["error"])
-            except Exception as e:
-                errors.append(f"Job {idx} failed: {str(e)}")
-
-        # Ordered results
-        ordered_results = [
-            results[i]
-            for i in range(len(payload.locations))
-            if i in results and results[i].get("result") is not None
-        ]
+        # Wait for all results concurrently, then map them back in request order
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        outcomes = dict(zip(unique_locations, results))
+        for idx, loc in enumerate(payload.locations):
+            result, error = _job_outcome(idx, outcomes[_location_key(loc)])
+            if error:
+                errors.append(error)
+            elif result:
+                ordered_results.append(result)
 
         response = MultiLocationResponse(
-            request_id=uuid.uuid4().hex,
+            request_id=_request_id(),
             locations_count=len(payload.locations),
             completed=len(ordered_results),
             result=[r["result"] for r in ordered_results],
@@ -220,34 +485,13 @@ async def process_locations(
 
         # Save result to DB if requested
         if payload.save_to_db:
-            try:
-                job = Job(
-                    request_id=response.request_id,
-                    locations_count=response.locations_count,
-                    completed=response.completed,
-                    saved_to_static=payload.save_to_static,
-                    user_id=user.id,
-                )
-                db.add(job)
-
-                for res in ordered_results:
-                    loc = res["location"]
-                    log = TrafficLog(
-                        job_id=response.request_id,
-                        lat=loc.get("lat"),
-                        lng=loc.get("lng"),
-                        day=loc.get("day"),
-                        time=loc.get("time"),
-                        result=res["result"],
-                        storefront_direction=loc.get("storefront_direction", "north"),
-                    )
-                    db.add(log)
-
-                await db.commit()
-            except Exception as e:
-                logger.warning(
-                    f"DB: failed to create process request {response.request_id}: {e}"
-                )
+            await _save_results(
+                user.id,
+                response.request_id,
+                response.locations_count,
+                payload.save_to_static,
+                ordered_results,
+            )
 
         return response
     except Exception as e:
@@ -263,20 +507,14 @@ async def process_one(
     request: Request,
     payload: LocationRequest,
     user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
 ):
     try:
         fut = POOL.dispatch(
-            {
-                "lat": payload.location.lat,
-                "lng": payload.location.lng,
-                "day": payload.location.day,
-                "time": payload.location.time,
-                "storefront_direction": payload.location.storefront_direction,
-                "zoom": payload.location.zoom,
-                "save_to_static": payload.save_to_static,
-                "base_url": str(request.base_url).rstrip("/"),
-            }
+            _job_payload(
+                payload.location,
+                payload.save_to_static,
+                str(request.base_url).rstrip("/"),
+            )
         )
 
         result = await fut
@@ -285,7 +523,7 @@ async def process_one(
             raise Exception(result["error"])
 
         response = LocationResponse(
-            request_id=uuid.uuid4().hex,
+            request_id=_request_id(),
             result=result["result"],
             saved_to_db=payload.save_to_db,
             saved_to_static=payload.save_to_static,
@@ -293,33 +531,9 @@ async def process_one(
 
         # Save result to DB if requested
         if payload.save_to_db:
-            try:
-                job = Job(
-                    user_id=user.id,
-                    request_id=response.request_id,
-                    locations_count=1,
-                    completed=1,
-                    saved_to_static=payload.save_to_static,
-                )
-                db.add(job)
-
-                loc = result["location"]
-                log = TrafficLog(
-                    job_id=response.request_id,
-                    lat=loc.get("lat"),
-                    lng=loc.get("lng"),
-                    day=loc.get("day"),
-                    time=loc.get("time"),
-                    result=result["result"],
-                    storefront_direction=loc.get("storefront_direction", "north"),
-                )
-                db.add(log)
-
-                await db.commit()
-            except Exception as e:
-                logger.warning(
-                    f"DB: failed to create process request {response.request_id}: {e}"
-                )
+            await _save_results(
+                user.id, response.request_id, 1, payload.save_to_static, [result]
+            )
 
         return response
     except Exception as e:
@@ -329,7 +543,7 @@ async def process_one(
 
 
 @app.get("/fetch-location", response_model=LocationResponse)
-async def get_job(
+async def fetch_location(
     request: Request,
     payload: LocationData,
     user=Depends(get_current_user),
@@ -338,23 +552,20 @@ async def get_job(
 
     try:
         result = await db.execute(
-            select(TrafficLog)
-            .join(Job)
-            .filter(
-                Job.user_id == user.id,
-                TrafficLog.lat == payload.lat,
-                TrafficLog.lng == payload.lng,
-                TrafficLog.storefront_direction == payload.storefront_direction,
-                TrafficLog.day == payload.day,
-                TrafficLog.time == payload.time,
-            )
+            FETCH_LOCATION_STMT,
+            {
+                "user_id": user.id,
+                "lat": round(payload.lat, COORD_DECIMALS),
+                "lng": round(payload.lng, COORD_DECIMALS),
+                "storefront_direction": payload.storefront_direction,
+                "day": payload.day,
+                "time": payload.time,
+            },
         )
-        saved_to_static = await db.execute(select(Job).filter(Job.user_id == user.id))
-        saved_to_static = saved_to_static.scalar_one().saved_to_static
-        request_record = result.scalar_one_or_none()
+        traffic_result, request_id, saved_to_static = result.first()
         return LocationResponse(
-            request_id=request_record.job_id,
-            result=request_record.result,
+            request_id=request_id,
+            result=traffic_result,
             saved_to_db=True,
             saved_to_static=saved_to_static,
         )
@@ -364,6 +575,44 @@ async def get_job(
         )
 
 
+async def _check_database() -> dict:
+    async with AsyncSessionLocal() as db:
+        # Test database connection with a simple query
+        await db.execute(select(1))
+    return {"status": "healthy", "details": "Database connection successful"}
+
+
+async def _check_worker_pool() -> dict:
+    worker_count = POOL.num_workers
+    alive = sum(p.is_alive() for p in POOL.processes)
+    return {
+        "status": "healthy",
+        "details": "Worker Pool is Alive",
+        "info": {
+            "workers_expected": worker_count,
+            "workers_alive": alive,
+            "worker_pool_status": "ok" if alive == worker_count else "degraded",
+            # Job counters
+            "jobs_pending": POOL.pending.value,
+            "jobs_completed": POOL.completed.value,
+        },
+    }
+
+
+async def _check_file_system() -> dict:
+    fs_error = getattr(app.state, "fs_error", "File system not checked yet")
+    if fs_error:
+        raise OSError(fs_error)
+    return {"status": "healthy", "details": "File system permissions are OK"}
+
+
+HEALTH_CHECKS = {
+    "database": _check_database,
+    "worker_pool": _check_worker_pool,
+    "file_system": _check_file_system,
+}
+
+
 @app.get("/health", tags=["Health"])
 async def health_check():
     """
@@ -371,74 +620,20 @@ async def health_check():
     """
     health_status = {
         "status": "healthy",
-        "timestamp": asyncio.get_event_loop().time(),
+        "timestamp": time.monotonic(),
         "version": "1.0.0",
         "dependencies": {},
     }
 
-    # Check database connection
-    try:
-        async for db in get_db():
-            # Test database connection with a simple query
-            result = await db.execute(select(1))
-            test_value = result.scalar()
-            health_status["dependencies"]["database"] = {
-                "status": "healthy",
-                "details": "Database connection successful",
-            }
-            break
-    except Exception as e:
-        health_status["status"] = "unhealthy"
-        health_status["dependencies"]["database"] = {
-            "status": "unhealthy",
-            "error": str(e),
-        }
-
-    # Check worker pool status
-    try:
-        worker_count = POOL.num_workers
-        alive = sum(p.is_alive() for p in POOL.processes)
-
-        health_status["dependencies"]["worker_pool"] = {
-            "status": "healthy",
-            "details": "Worker Pool is Alive",
-            "info": {
-                "workers_expected": worker_count,
-                "workers_alive": alive,
-                "worker_pool_status": "ok" if alive == worker_count else "degraded",
-                # Check queues
-                "job_queue_size": POOL.job_queue.qsize(),
-                "result_queue_size": POOL.result_queue.qsize(),
-            },
-        }
-
-    except Exception as e:
-        health_status["status"] = "unhealthy"
-        health_status["dependencies"]["worker_pool"] = {
-            "status": "unhealthy",
-            "error": str(e),
-        }
-
-    # Check file system permissions
-    try:
-        test_dirs = ["static", "static/images", "static/images/traffic_screenshots"]
-        for dir_path in test_dirs:
-            os.makedirs(dir_path, exist_ok=True)
-            test_file = os.path.join(dir_path, "health_test.txt")
-            with open(test_file, "w") as f:
-                f.write("health_check")
-            os.remove(test_file)
-
-        health_status["dependencies"]["file_system"] = {
-            "status": "healthy",
-            "details": "File system permissions are OK",
-        }
-    except Exception as e:
-        health_status["status"] = "unhealthy"
-        health_status["dependencies"]["file_system"] = {
-            "status": "unhealthy",
-            "error": str(e),
-        }
+    # Probe all dependencies concurrently
+    results = await asyncio.gather(
+        *(check() for check in HEALTH_CHECKS.values()), return_exceptions=True
+    )
+    for name, result in zip(HEALTH_CHECKS, results):
+        if isinstance(result, Exception):
+            health_status["status"] = "unhealthy"
+            result = {"status": "unhealthy", "error": str(result)}
+        health_status["dependencies"][name] = result
 
     return health_status
 
@@ -451,7 +646,7 @@ async def readiness_probe():
     """
     readiness_status = {
         "status": "ready",
-        "timestamp": asyncio.get_event_loop().time(),
+        "timestamp": time.monotonic(),
     }
 
     # Check critical dependencies
@@ -459,10 +654,9 @@ async def readiness_probe():
 
     # Database check
     try:
-        async for db in get_db():
+        async with AsyncSessionLocal() as db:
             await db.execute(select(1))
             critical_checks.append(("database", True))
-            break
     except Exception:
         critical_checks.append(("database", False))
 
@@ -491,7 +685,7 @@ async def liveness_probe():
     Liveness probe for Kubernetes/container orchestration.
     Simple check to see if the service is alive.
     """
-    return {"status": "alive", "timestamp": asyncio.get_event_loop().time()}
+    return {"status": "alive", "timestamp": time.monotonic()}
 
 
 @app.get("/")
@@ -8,6 +8,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
 )
@@ -29,6 +30,18 @@ class User(Base):
 
 class TrafficLog(Base):
     __tablename__ = "traffic_logs"
+    # Covers the /fetch-location equality lookup and its join to jobs
+    __table_args__ = (
+        Index(
+            "ix_traffic_logs_lookup",
+            "lat",
+            "lng",
+            "storefront_direction",
+            "day",
+            "time",
+            "job_id",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -42,7 +55,8 @@ class TrafficLog(Base):
 
     job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
 
-    job = relationship("Job", back_populates="traffic_logs")
+    # Lazy loads can't run under AsyncSession, fail loudly instead
+    job = relationship("Job", back_populates="traffic_logs", lazy="raise_on_sql")
 
 
 class Job(Base):
@@ -58,10 +72,10 @@ class Job(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user_id = Column(
-        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
     )
 
-    user = relationship("User", back_populates="jobs")
+    user = relationship("User", back_populates="jobs", lazy="raise_on_sql")
     traffic_logs = relationship(
         "TrafficLog", back_populates="job", cascade="all, delete-orphan"
     )
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 
+import asyncio
 import io
 import math
 import os
@@ -70,6 +71,10 @@ TRAFFIC_SCREENSHOTS_STATIC_PATH = os.path.join(
     "images",
     "traffic_screenshots",
 )
+# Square around the map center, large enough for the 150 m analysis ring at zoom 18
+SCREENSHOT_CLIP_SIZE = 480
+# Saved screenshots are only viewed, so they are stored as JPEG
+SAVED_SCREENSHOT_QUALITY = 75
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
 
 
@@ -506,8 +511,17 @@ def calculate_final_traffic_score(analysis: Dict[str, Any]) -> Dict[str, Any]:
 async def get_traffic_screenshot(
     page: Page,
 ) -> bytes:
+    viewport = page.viewport_size or {"width": 1200, "height": 800}
+    # Only rasterize the region the analyzer reads, centered on the location
+    clip = {
+        "x": viewport["width"] // 2 - SCREENSHOT_CLIP_SIZE // 2,
+        "y": viewport["height"] // 2 - SCREENSHOT_CLIP_SIZE // 2,
+        "width": SCREENSHOT_CLIP_SIZE,
+        "height": SCREENSHOT_CLIP_SIZE,
+    }
     try:
-        screenshot_bytes = await page.screenshot(type="png")
+        # PNG keeps the exact traffic colors the analysis relies on
+        screenshot_bytes = await page.screenshot(type="png", clip=clip)
         logger.info("Screenshot captured at 20m zoom level.")
         return screenshot_bytes
     except Exception as screenshot_error:
@@ -675,7 +689,9 @@ def process_screenshot(
 
         # Convert back to bytes
         with io.BytesIO() as output_buffer:
-            image.save(output_buffer, format="PNG")
+            image.convert("RGB").save(
+                output_buffer, format="JPEG", quality=SAVED_SCREENSHOT_QUALITY
+            )
             pinned_image_bytes = output_buffer.getvalue()
 
         return pinned_image_bytes, analysis
@@ -695,7 +711,7 @@ async def save_screenshot(
         str(target_time).replace(":", "-") if target_time is not None else "no_time"
     )
 
-    filename = f"traffic_{lat}_{lng}_{safe_day_of_week}_{safe_target_time}_pinned.png"
+    filename = f"traffic_{lat}_{lng}_{safe_day_of_week}_{safe_target_time}_pinned.jpg"
     static_path = os.path.join(
         TRAFFIC_SCREENSHOTS_STATIC_PATH,
         filename,
@@ -742,10 +758,11 @@ async def analyze_location_traffic(
             logger.error(error_msg)
             raise Exception(error_msg)
 
-        # Image processor
+        # Image processor, off the event loop so the worker's other pages
+        # keep loading meanwhile
         with timer(f"Image processing for {lat},{lng}"):
-            pinned_image_bytes, analysis = process_screenshot(
-                screenshot_bytes, lat, lng, storefront_direction
+            pinned_image_bytes, analysis = await asyncio.to_thread(
+                process_screenshot, screenshot_bytes, lat, lng, storefront_direction
             )
 
         if not analysis:
@@ -824,17 +841,25 @@ async def accept_cookies(page: Page) -> bool:
     raise
 
 
-async def setup_context_with_cookies(browser: BrowserContext) -> BrowserContext:
-    """Setup context and accept cookies once for all pages"""
+async def setup_context_with_cookies(
+    browser: BrowserContext, storage_state: Optional[dict] = None
+) -> tuple[BrowserContext, bool]:
+    """Setup context and accept cookies once, returns (context, accepted)"""
 
     with timer(f"Create new context and accept cookies"):
         context = await browser.new_context(
             locale="en-US",
             viewport=ViewportSize(width=1200, height=800),
             user_agent=USER_AGENT,
+            storage_state=storage_state,
         )
 
+        # Cookies were already accepted in the saved state
+        if storage_state is not None:
+            return context, True
+
         setup_page = None
+        accepted = False
         try:
             # Create a temporary page to accept cookies once for this context
             setup_page = await context.new_page()
@@ -844,6 +869,7 @@ async def setup_context_with_cookies(browser: BrowserContext) -> BrowserContext:
                 timeout=sec(10),
             )
             await accept_cookies(setup_page)
+            accepted = True
             logger.info("Cookie banner accepted")
         except Exception:
             logger.info("No cookie banner found")
@@ -851,4 +877,4 @@ async def setup_context_with_cookies(browser: BrowserContext) -> BrowserContext:
             if setup_page:
                 await setup_page.close()
 
-        return context
+        return context, accepted
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+One-off migration: round the coordinates of traffic logs saved before
+COORD_DECIMALS was applied, so /fetch-location finds them again.
+
+    python round_coordinates.py
+"""
+
+import asyncio
+
+from sqlalchemy import bindparam, func, or_, select, update
+
+from config import COORD_DECIMALS, logger
+from db import engine
+from models_db import TrafficLog
+
+
+async def round_stored_coordinates():
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            select(TrafficLog.id, TrafficLog.lat, TrafficLog.lng).where(
+                or_(
+                    TrafficLog.lat != func.round(TrafficLog.lat, COORD_DECIMALS),
+                    TrafficLog.lng != func.round(TrafficLog.lng, COORD_DECIMALS),
+                )
+            )
+        )
+        # Rounded in Python, the same way the values are bound on lookup
+        rows = [
+            {
+                "row_id": row_id,
+                "new_lat": round(lat, COORD_DECIMALS),
+                "new_lng": round(lng, COORD_DECIMALS),
+            }
+            for row_id, lat, lng in result
+            if (round(lat, COORD_DECIMALS), round(lng, COORD_DECIMALS)) != (lat, lng)
+        ]
+        if rows:
+            await conn.execute(
+                update(TrafficLog)
+                .where(TrafficLog.id == bindparam("row_id"))
+                .values(lat=bindparam("new_lat"), lng=bindparam("new_lng")),
+                rows,
+            )
+    await engine.dispose()
+    logger.info(f"Rounded the coordinates of {len(rows)} stored traffic logs")
+
+
+if __name__ == "__main__":
+    asyncio.run(round_stored_coordinates())
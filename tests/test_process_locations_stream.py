@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+import tempfile
+
+os.environ.setdefault("SQLITE_DB_FILE", os.path.join(tempfile.mkdtemp(), "test.db"))
+
+from sqlalchemy import func, select  # noqa: E402
+
+import main  # noqa: E402
+from db import AsyncSessionLocal, Base, engine  # noqa: E402
+from models_db import Job, TrafficLog, User  # noqa: E402
+
+
+class FakePool:
+    """
+    Resolves the first location right away and leaves the others pending,
+    like a batch whose slow locations are still being analyzed.
+    """
+
+    def dispatch_batch(self, loc_dicts):
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in loc_dicts]
+        futures[0].set_result(
+            {"ok": True, "location": loc_dicts[0], "result": {"score": 1.0}}
+        )
+        return futures
+
+
+async def _setup_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            main.insert(User).values(id=1, username="tester", hashed_password="x")
+        )
+
+
+async def _stream_then_disconnect(body: bytes) -> list:
+    """
+    Call the ASGI app directly and disconnect once the first line arrived.
+    """
+    first_line = asyncio.Event()
+    request_sent = False
+    messages = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await first_line.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_line.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/process-locations/stream",
+        "raw_path": b"/process-locations/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"test"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+    }
+    await asyncio.wait_for(main.app(scope, receive, send), timeout=10)
+    return messages
+
+
+def test_stream_saves_sent_rows_after_client_disconnect(monkeypatch):
+    monkeypatch.setattr(main, "POOL", FakePool())
+    main.app.dependency_overrides[main.get_current_user] = lambda: User(id=1)
+    body = json.dumps(
+        {
+            "save_to_db": True,
+            "locations": [{"lat": 24.7136, "lng": 46.6753}, {"lat": 1.0, "lng": 2.0}],
+        }
+    ).encode()
+
+    async def run():
+        await _setup_db()
+        messages = await _stream_then_disconnect(body)
+        headers = dict(messages[0]["headers"])
+        request_id = headers[b"x-request-id"].decode()
+
+        async with AsyncSessionLocal() as db:
+            job = (
+                await db.execute(select(Job).where(Job.request_id == request_id))
+            ).scalar_one()
+            logs = await db.scalar(
+                select(func.count())
+                .select_from(TrafficLog)
+                .where(TrafficLog.job_id == job.id)
+            )
+        await engine.dispose()
+        return job, logs
+
+    try:
+        job, logs = asyncio.run(run())
+    finally:
+        main.app.dependency_overrides.clear()
+
+    assert job.locations_count == 2
+    assert job.completed == 1
+    assert logs == 1
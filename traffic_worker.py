@@ -1,129 +1,329 @@
 import asyncio
 import os
+import socket
+import time
 import traceback
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
 
+import orjson
 from playwright.async_api import ProxySettings, async_playwright
 
-from config import PROXY_BYPASS, PROXY_PASSWORD, PROXY_SERVER, PROXY_USERNAME, logger
+from config import (
+    BROWSER_JS_HEAP_MB,
+    COOKIE_STATE_MAX_AGE,
+    COOKIE_STATE_PATH,
+    MAX_PARALLEL_PAGES,
+    PROXY_BYPASS,
+    PROXY_PASSWORD,
+    PROXY_SERVER,
+    PROXY_USERNAME,
+    logger,
+)
 from playwright_traffic_analysis import (
     analyze_location_traffic,
     setup_context_with_cookies,
 )
 
 MAX_JOBS_PER_WORKER = 20
+MAX_USES_PER_CONTEXT = 5
+
+# Built once at import, empty env values count as unset
+PROXY_SETTINGS = (
+    ProxySettings(
+        server=PROXY_SERVER,
+        bypass=PROXY_BYPASS or None,
+        username=PROXY_USERNAME or None,
+        password=PROXY_PASSWORD or None,
+    )
+    if PROXY_SERVER
+    else None
+)
+
+
+def load_storage_state():
+    """
+    Read the saved cookie state, None when missing or older than COOKIE_STATE_MAX_AGE.
+    """
+    try:
+        if time.time() - os.path.getmtime(COOKIE_STATE_PATH) > COOKIE_STATE_MAX_AGE:
+            return None
+        with open(COOKIE_STATE_PATH, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def save_storage_state(state):
+    # Workers may save at the same time, replace the file atomically
+    tmp_path = f"{COOKIE_STATE_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(state))
+        os.replace(tmp_path, COOKIE_STATE_PATH)
+    except OSError as e:
+        logger.warning(f"Failed to save browser storage state: {e}")
+
+
+class BrowserContextPool:
+    """
+    Reuses browser contexts across jobs and closes each one after
+    MAX_USES_PER_CONTEXT jobs, Playwright only frees page resources when
+    their context is closed.
+    """
+
+    def __init__(self, browser):
+        self.browser = browser
+        self._idle = []  # (context, uses)
+        self._storage_state = load_storage_state()
+
+    async def _new_context(self):
+        context, accepted = await setup_context_with_cookies(
+            self.browser, self._storage_state
+        )
+        if self._storage_state is None and accepted:
+            # Later contexts, and later worker starts, begin with the accepted cookies
+            self._storage_state = await context.storage_state()
+            save_storage_state(self._storage_state)
+        return context
+
+    @asynccontextmanager
+    async def acquire(self):
+        if self._idle:
+            context, uses = self._idle.pop()
+        else:
+            context, uses = await self._new_context(), 0
+
+        try:
+            yield context
+        except Exception:
+            # Don't hand a context in an unknown state to the next job
+            await context.close()
+            raise
+
+        if uses + 1 < MAX_USES_PER_CONTEXT:
+            self._idle.append((context, uses + 1))
+        else:
+            await context.close()
+
+    async def close(self):
+        for context, _ in self._idle:
+            await context.close()
+        self._idle.clear()
+
+
+def post_result(result_queue, job_id, result):
+    # Results cross the process boundary as orjson bytes instead of pickles
+    result_queue.put(orjson.dumps((job_id, result), option=orjson.OPT_SERIALIZE_NUMPY))
+
+
+async def run_job(contexts, job_id, location, result_queue):
+    """
+    Analyze one location in a pooled browser context and post the result.
+    """
+    try:
+        async with contexts.acquire() as context:
+            result = await analyze_location_traffic(
+                context,
+                lat=location["lat"],
+                lng=location["lng"],
+                day_of_week=location.get("day"),
+                target_time=location.get("time"),
+                storefront_direction=location.get("storefront_direction", "north"),
+                zoom=location.get("zoom", 18),
+                save_to_static=location.get("save_to_static", False),
+                request_base_url=location.get("base_url"),
+            )
+
+        post_result(
+            result_queue,
+            job_id,
+            {"ok": True, "location": location, "result": result},
+        )
+
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.error(f"Error in worker {os.getpid()}: {str(e)}\n{tb}")
+        post_result(
+            result_queue,
+            job_id,
+            {
+                "ok": False,
+                "location": location,
+                "error": str(e),
+                "traceback": tb,
+            },
+        )
 
 
-async def worker_loop(job_queue, result_queue):
+def free_port() -> int:
+    """
+    Ask the OS for a currently unused local TCP port.
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def launch_browser(playwright, cdp_port: Optional[int] = None):
+    """
+    Launch headless Chromium, optionally listening for CDP clients on cdp_port.
+    """
+    args = [
+        "--no-sandbox",
+        "--disable-gpu",
+        "--disable-dev-shm-usage",
+        "--disable-setuid-sandbox",
+        "--disable-extensions",
+        "--no-first-run",
+        "--disable-sync",
+        "--disable-default-apps",
+        "--hide-scrollbars",
+        "--disable-infobars",
+        "--mute-audio",
+        "--disable-logging",
+        f"--js-flags=--max-old-space-size={BROWSER_JS_HEAP_MB}",
+    ]
+    if cdp_port:
+        # Let the worker processes attach to this browser over CDP
+        args += [
+            "--remote-debugging-address=127.0.0.1",
+            f"--remote-debugging-port={cdp_port}",
+        ]
+    return await playwright.chromium.launch(
+        headless=True,
+        chromium_sandbox=False,
+        args=args,
+        proxy=PROXY_SETTINGS,
+    )
+
+
+async def worker_loop(
+    job_queue,
+    result_queue,
+    cdp_endpoint: Optional[str] = None,
+    backlog: Optional[deque] = None,
+):
     """
     A persistent worker that:
     - Starts Playwright
     - Processes incoming tasks
     - Restarts periodically to prevent memory leaks
+
+    With cdp_endpoint the worker attaches to the parent's shared Chromium
+    instead of launching its own. backlog holds jobs received but not yet
+    started, left in it for the next run when the browser disconnects.
+
+    Returns True once the worker should exit, False to restart the browser.
     """
     job_count = 0
+    stopped = False
     playwright = None
     browser = None
+    owns_browser = False
+    contexts = None
 
     try:
         playwright = await async_playwright().start()
-        proxy_settings = (
-            ProxySettings(
-                server=PROXY_SERVER,
-                bypass=PROXY_BYPASS,
-                username=PROXY_USERNAME,
-                password=PROXY_PASSWORD,
-            )
-            if PROXY_SERVER
-            else None
-        )
-        browser = await playwright.chromium.launch(
-            headless=True,
-            chromium_sandbox=False,
-            args=[
-                "--no-sandbox",
-                "--disable-gpu",
-                "--disable-dev-shm-usage",
-                "--disable-setuid-sandbox",
-                "--disable-extensions",
-                "--no-first-run",
-                "--disable-sync",
-                "--disable-default-apps",
-                "--hide-scrollbars",
-                "--disable-infobars",
-                "--mute-audio",
-                "--disable-logging",
-            ],
-            proxy=proxy_settings,
-        )
+        if cdp_endpoint:
+            # Share the parent's Chromium, this worker only opens its contexts
+            try:
+                browser = await playwright.chromium.connect_over_cdp(cdp_endpoint)
+            except Exception as e:
+                # Keep serving the queue while the parent relaunches its browser
+                logger.warning(
+                    f"⚠️ Worker {os.getpid()} could not attach to {cdp_endpoint}: {e}"
+                )
+        if browser is None:
+            browser = await launch_browser(playwright)
+            owns_browser = True
+
+        # Restart on a lost browser instead of failing every job after it
+        disconnected = asyncio.Event()
+        browser.on("disconnected", lambda _: disconnected.set())
 
         logger.info(f"✅ Worker {os.getpid()} browser initialized")
+        contexts = BrowserContextPool(browser)
 
-        while job_count < MAX_JOBS_PER_WORKER:
-            try:
-                job = await asyncio.get_event_loop().run_in_executor(
-                    None, job_queue.get
-                )
-            except Exception as e:
-                logger.error(f"Error getting job from queue: {e}")
-                break
+        # Run several jobs at once on the shared browser, the time is mostly
+        # spent waiting on page loads
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_PAGES)
+        tasks = set()
+        if backlog is None:
+            backlog = deque()
 
-            if job == "STOP":
-                job_queue.put("STOP")
-                return
+        # A received batch is always finished, even past MAX_JOBS_PER_WORKER
+        while not disconnected.is_set() and (
+            backlog or job_count < MAX_JOBS_PER_WORKER
+        ):
+            await semaphore.acquire()
+            if not backlog:
+                try:
+                    job = await asyncio.get_event_loop().run_in_executor(
+                        None, job_queue.get
+                    )
+                except Exception as e:
+                    logger.error(f"Error getting job from queue: {e}")
+                    semaphore.release()
+                    stopped = True
+                    break
 
-            job_id, location = job
-            job_count += 1
+                if job == "STOP":
+                    semaphore.release()
+                    stopped = True
+                    break
 
-            context = None
-            try:
-                context = await setup_context_with_cookies(browser)
-
-                result = await analyze_location_traffic(
-                    context,
-                    lat=location["lat"],
-                    lng=location["lng"],
-                    day_of_week=location.get("day"),
-                    target_time=location.get("time"),
-                    storefront_direction=location.get("storefront_direction", "north"),
-                    zoom=location.get("zoom", 18),
-                    save_to_static=location.get("save_to_static", False),
-                    request_base_url=location.get("base_url"),
-                )
+                # WorkerPool puts a list of (job_id, location) pairs as JSON
+                backlog.extend(orjson.loads(job))
 
-                result_queue.put(
-                    (job_id, {"ok": True, "location": location, "result": result})
-                )
+            if disconnected.is_set():
+                # Don't start jobs on a dead browser, the next run takes them
+                semaphore.release()
+                break
 
-            except Exception as e:
-                tb = traceback.format_exc()
-                logger.error(f"Error in worker {os.getpid()}: {str(e)}\n{tb}")
-                result_queue.put(
-                    (
-                        job_id,
-                        {
-                            "ok": False,
-                            "location": location,
-                            "error": str(e),
-                            "traceback": tb,
-                        },
-                    )
-                )
-            finally:
-                if context:
-                    await context.close()
+            job_id, location = backlog.popleft()
+            job_count += 1
+
+            task = asyncio.create_task(
+                run_job(contexts, job_id, location, result_queue)
+            )
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            task.add_done_callback(lambda _: semaphore.release())
+
+        # Let the jobs in flight finish before the browser is closed
+        if tasks:
+            await asyncio.gather(*tasks)
 
     except Exception as e:
         logger.error(f"Fatal error in worker {os.getpid()}: {e}")
+        stopped = True
     finally:
-        if browser:
+        if contexts:
+            await contexts.close()
+        # The shared browser belongs to the parent, stopping Playwright
+        # below only disconnects from it
+        if browser and owns_browser:
             await browser.close()
         if playwright:
             await playwright.stop()
         logger.info(f"♻️ Worker {os.getpid()} shutting down (Job count: {job_count})")
 
+    return stopped
+
 
-def worker_entrypoint(job_queue, result_queue):
+def worker_entrypoint(
+    job_queue,
+    result_queue,
+    cdp_endpoint: Optional[str] = None,
+):
     """
     Sync entrypoint required for multiprocessing.
+    Each worker owns its job queue, so the browser is recycled in-process
+    instead of leaving the queue without a consumer.
     """
-    asyncio.run(worker_loop(job_queue, result_queue))
+    # Jobs not started before a browser disconnect carry over to the next run
+    backlog = deque()
+    while not asyncio.run(worker_loop(job_queue, result_queue, cdp_endpoint, backlog)):
+        pass
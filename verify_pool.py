@@ -2,6 +2,8 @@ import asyncio
 import os
 import sys
 
+import orjson
+
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -15,15 +17,17 @@ async def mock_worker_loop(job_queue, result_queue):
             job = job_queue.get()
             if job == "STOP":
                 break
-            job_id, data = job
-            # Simulate processing time
-            await asyncio.sleep(data.get("delay", 0.1))
-            result_queue.put((job_id, {"ok": True, "data": data["val"]}))
+            for job_id, data in orjson.loads(job):
+                # Simulate processing time
+                await asyncio.sleep(data.get("delay", 0.1))
+                result_queue.put(
+                    orjson.dumps((job_id, {"ok": True, "data": data["val"]}))
+                )
         except Exception:
             break
 
 
-def mock_worker_entrypoint(job_queue, result_queue):
+def mock_worker_entrypoint(job_queue, result_queue, cdp_endpoint=None):
     asyncio.run(mock_worker_loop(job_queue, result_queue))
 
 
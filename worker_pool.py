@@ -1,26 +1,77 @@
 import asyncio
+import itertools
 import threading
+import time
 import uuid
-from multiprocessing import Process, Queue
+from collections import OrderedDict
+from multiprocessing import Process, Queue, Value
 from typing import Any, Dict, List, Optional
 
-from config import logger
+import orjson
+
+from config import JOB_TIMEOUT, logger
 from traffic_worker import worker_entrypoint
 
+# Traffic tiles change slowly, repeat lookups within the TTL skip Playwright
+RESULT_CACHE_TTL = 600  # seconds
+RESULT_CACHE_SIZE = 10000
+
+
+def _set_result(future: asyncio.Future, result: Any):
+    # The awaiting request may have been cancelled since the result arrived
+    if not future.done():
+        future.set_result(result)
+
+
+def _expire(future: asyncio.Future):
+    # The worker holding the job died or hangs, fail the request instead of waiting
+    if not future.done():
+        future.set_exception(
+            TimeoutError(f"No worker result after {JOB_TIMEOUT} seconds")
+        )
+
+
+def _cache_key(loc_dict: Dict[str, Any]) -> Optional[tuple]:
+    if "lat" not in loc_dict or "lng" not in loc_dict:
+        return None
+    # Exact coordinates, a cached result carries its location's coordinates
+    # and screenshot paths
+    return (
+        loc_dict["lat"],
+        loc_dict["lng"],
+        loc_dict.get("day"),
+        loc_dict.get("time"),
+        loc_dict.get("storefront_direction"),
+        loc_dict.get("zoom"),
+        loc_dict.get("save_to_static"),
+        loc_dict.get("base_url"),
+    )
+
 
 class WorkerPool:
     def __init__(self, num_workers: int):
         self.num_workers = num_workers
-        self.job_queue = Queue()
+        # One job queue per worker, dispatched round-robin
+        self.job_queues = [Queue() for _ in range(num_workers)]
+        self._next_worker = itertools.count()
         self.result_queue = Queue()
+        # Job counters for /health, cheaper than qsize() on the shared queues
+        self.pending = Value("i", 0)
+        self.completed = Value("i", 0)
         self.processes: List[Process] = []
         self._pending_jobs: Dict[str, asyncio.Future] = {}
         self._loop = None
         self._result_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        self.cdp_endpoint: Optional[str] = None
+        self._result_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
 
-    def start(self):
+    def start(self, cdp_endpoint: Optional[str] = None):
+        """
+        Spawn the workers, attached to a shared browser when cdp_endpoint is set.
+        """
         self._loop = asyncio.get_running_loop()
+        self.cdp_endpoint = cdp_endpoint
         self._stop_event.clear()
 
         # Start workers
@@ -37,7 +88,7 @@ class WorkerPool:
     def _spawn_worker(self, index: int):
         p = Process(
             target=worker_entrypoint,
-            args=(self.job_queue, self.result_queue),
+            args=(self.job_queues[index], self.result_queue, self.cdp_endpoint),
             name=f"TrafficWorker-{index}",
             daemon=True,
         )
@@ -54,24 +105,26 @@ class WorkerPool:
         """
         while not self._stop_event.is_set():
             try:
-                result_data = self.result_queue.get(timeout=1.0)
+                # Block until a result arrives, stop() wakes us with "STOP"
+                result_data = self.result_queue.get()
                 if result_data == "STOP":
                     break
 
-                job_id, result = result_data
-                if job_id in self._pending_jobs:
-                    future = self._pending_jobs.pop(job_id)
-                    if not future.done():
-                        if self._loop is None:
-                            self._loop = asyncio.get_running_loop()
-                        self._loop.call_soon_threadsafe(future.set_result, result)
+                job_id, result = orjson.loads(result_data)
+                with self.pending.get_lock():
+                    self.pending.value -= 1
+                with self.completed.get_lock():
+                    self.completed.value += 1
+                future = self._pending_jobs.pop(job_id, None)
+                if future is not None:
+                    self._loop.call_soon_threadsafe(_set_result, future, result)
             except Exception:
                 continue
 
     def stop(self):
         self._stop_event.set()
-        for _ in range(self.num_workers):
-            self.job_queue.put("STOP")
+        for job_queue in self.job_queues:
+            job_queue.put("STOP")
 
         if self._result_thread:
             self.result_queue.put("STOP")
@@ -84,9 +137,9 @@ class WorkerPool:
 
         logger.info("🛑 WorkerPool stopped")
 
-    def dispatch(self, loc_dict: Dict[str, Any]) -> asyncio.Future:
+    def _new_job(self):
         """
-        Send a job to workers and return a future that will resolve with the result.
+        Register a pending job and return its id and future.
         """
         job_id = str(uuid.uuid4())
 
@@ -95,10 +148,103 @@ class WorkerPool:
 
         future = self._loop.create_future()
         self._pending_jobs[job_id] = future
+        # Forget the job if the caller cancels, e.g. on client disconnect
+        future.add_done_callback(lambda _: self._pending_jobs.pop(job_id, None))
+        timeout = self._loop.call_later(JOB_TIMEOUT, _expire, future)
+        future.add_done_callback(lambda _: timeout.cancel())
+        return job_id, future
 
-        self.job_queue.put((job_id, loc_dict))
+    def _cached_future(self, loc_dict: Dict[str, Any]) -> Optional[asyncio.Future]:
+        """
+        Return an already resolved future if a fresh result is cached.
+        """
+        key = _cache_key(loc_dict)
+        entry = self._result_cache.get(key) if key is not None else None
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._result_cache[key]
+            return None
+
+        self._result_cache.move_to_end(key)
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(result)
         return future
 
+    def _cache_result(self, loc_dict: Dict[str, Any], future: asyncio.Future):
+        """
+        Store a successful result for RESULT_CACHE_TTL seconds.
+        """
+        key = _cache_key(loc_dict)
+        if key is None or future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        if not result.get("ok"):
+            return
+
+        self._result_cache[key] = (time.monotonic() + RESULT_CACHE_TTL, result)
+        self._result_cache.move_to_end(key)
+        while len(self._result_cache) > RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+
+    def _next_queue(self) -> Queue:
+        """
+        Pick the next worker's job queue round-robin.
+        """
+        index = next(self._next_worker) % self.num_workers
+        p = self.processes[index]
+        if not p.is_alive():
+            # Don't leave the job on a shard nobody reads until check_health
+            logger.warning(f"⚠️ Worker process {p.name} died. Restarting...")
+            self._spawn_worker(index)
+        return self.job_queues[index]
+
+    def dispatch(self, loc_dict: Dict[str, Any]) -> asyncio.Future:
+        """
+        Send a job to workers and return a future that will resolve with the result.
+        """
+        cached = self._cached_future(loc_dict)
+        if cached is not None:
+            return cached
+
+        job_id, future = self._new_job()
+        future.add_done_callback(lambda f: self._cache_result(loc_dict, f))
+        with self.pending.get_lock():
+            self.pending.value += 1
+        self._next_queue().put(orjson.dumps([(job_id, loc_dict)]))
+        return future
+
+    def dispatch_batch(self, loc_dicts: List[Dict[str, Any]]) -> List[asyncio.Future]:
+        """
+        Send several jobs with one put per worker queue and return their
+        futures in the same order.
+        """
+        futures = []
+        batches: Dict[int, List] = {}
+        dispatched = 0
+        for loc_dict in loc_dicts:
+            cached = self._cached_future(loc_dict)
+            if cached is not None:
+                futures.append(cached)
+                continue
+
+            job_id, future = self._new_job()
+            future.add_done_callback(
+                lambda f, loc_dict=loc_dict: self._cache_result(loc_dict, f)
+            )
+            futures.append(future)
+            batches.setdefault(dispatched % self.num_workers, []).append(
+                (job_id, loc_dict)
+            )
+            dispatched += 1
+
+        with self.pending.get_lock():
+            self.pending.value += dispatched
+        for jobs in batches.values():
+            self._next_queue().put(orjson.dumps(jobs))
+        return futures
+
     def check_health(self):
         """
         Check if processes are alive and restart if necessary.